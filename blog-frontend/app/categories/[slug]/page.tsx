@@ -1,5 +1,5 @@
 import { notFound } from 'next/navigation';
-import { getCategoryBySlug, getPosts, getAdSenseSettings } from '../../lib/api';
+import { getCategoryBySlug, getPosts, getAdSenseSettings, getArchive } from '../../lib/api';
 import PostArchive from '../../components/PostArchive';
 
 export const revalidate = 60;
@@ -25,9 +25,10 @@ export default async function CategoryPage({ params }: { params: Promise<{ slug:
     notFound();
   }
 
-  const [posts, adsenseConfig] = await Promise.all([
+  const [posts, adsenseConfig, months] = await Promise.all([
     getPosts({ category: category.id }),
     getAdSenseSettings(),
+    getArchive({ category: category.id, posts: true, per_bucket: 10 }),
   ]);
 
   return (
@@ -37,6 +38,7 @@ export default async function CategoryPage({ params }: { params: Promise<{ slug:
       posts={posts}
       emptyLabel={`No posts found in ${category.name}.`}
       adsenseConfig={adsenseConfig}
+      months={months}
     />
   );
 }
@@ -1,7 +1,9 @@
 import Link from 'next/link';
 import PostCard from './PostCard';
 import AdSenseAd from './AdSenseAd';
-import { Post, AdSenseConfig } from '../lib/api';
+import { Post, AdSenseConfig, ArchiveBucket } from '../lib/api';
+
+const MONTH_FORMAT = new Intl.DateTimeFormat('en', { month: 'long', year: 'numeric', timeZone: 'UTC' });
 
 export default function PostArchive({
   title,
@@ -9,12 +11,15 @@ export default function PostArchive({
   posts,
   emptyLabel,
   adsenseConfig,
+  months,
 }: {
   title: string;
   subtitle: string;
   posts: Post[];
   emptyLabel: string;
   adsenseConfig?: AdSenseConfig | null;
+  // From /api/archive/?posts=1: month buckets with counts and post stubs
+  months?: ArchiveBucket[];
 }) {
   return (
     <main className="container mx-auto px-4 py-8 md:py-12">
@@ -50,6 +55,33 @@ export default function PostArchive({
         </div>
       )}
 
+      {months && months.length > 0 && (
+        <section className="mt-12 glass-card p-6 md:p-8 layer-2">
+          <h2 className="text-2xl font-bold mb-6">Archive</h2>
+          <div className="space-y-6">
+            {months.map((bucket) => (
+              <div key={`${bucket.year}-${bucket.month}`}>
+                <h3 className="text-lg font-semibold mb-2">
+                  {MONTH_FORMAT.format(new Date(Date.UTC(bucket.year, bucket.month - 1, 1)))}{' '}
+                  <span className="muted text-sm">({bucket.count})</span>
+                </h3>
+                {bucket.posts && bucket.posts.length > 0 && (
+                  <ul className="space-y-1">
+                    {bucket.posts.map((stub) => (
+                      <li key={stub.id}>
+                        <Link href={`/posts/${stub.slug}`} className="hover:underline">
+                          {stub.title}
+                        </Link>
+                      </li>
+                    ))}
+                  </ul>
+                )}
+              </div>
+            ))}
+          </div>
+        </section>
+      )}
+
       {adsenseConfig && (
         <div className="mt-8">
           <AdSenseAd config={adsenseConfig} placement="homepage" />
@@ -6,7 +6,7 @@ export default function PostCard({ post, featured = false }: { post: Post; featu
   const cardClass = featured ? 'bento-item-featured' : '';
 
   const imageUrl = post.featured_image_url || post.featured_image;
-  const plainContent = post.content ? post.content.replace(/<[^>]+>/g, '') : '';
+  const plainContent = post.excerpt || (post.content ? post.content.replace(/<[^>]+>/g, '') : '');
 
   return (
     <article className={`glass-card overflow-hidden group layer-2 transition-all duration-300 cursor-pointer ${cardClass}`}>
@@ -90,6 +90,7 @@ export default function PostCard({ post, featured = false }: { post: Post; featu
           {/* Date */}
           <time className="text-xs muted">
             {new Date(post.created_at).toLocaleDateString('en-US', { month: 'short', day: 'numeric' })}
+            {post.reading_minutes ? ` · ${post.reading_minutes} min read` : ''}
           </time>
         </div>
       </div>
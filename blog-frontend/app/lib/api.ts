@@ -27,12 +27,26 @@ export type Category = {
   id: number;
   name: string;
   slug: string;
+  post_count?: number;
+};
+
+export type TocEntry = {
+  level: 2 | 3;
+  text: string;
+  anchor: string;
 };
 
 export type Post = {
   id: number;
   title: string;
-  content: string;
+  // List endpoints return the compact card shape: no content/comments, but excerpt and comment_count.
+  content?: string;
+  excerpt?: string;
+  comment_count?: number;
+  // Derived from content on save: lists get counts without downloading the body.
+  word_count?: number;
+  reading_minutes?: number;
+  toc?: TocEntry[];
   author?: string;
   category?: number | null;
   category_name?: string;
@@ -87,25 +101,69 @@ export async function getAdSenseSettings(): Promise<AdSenseConfig | null> {
   }
 }
 
-export async function getPosts(filters?: {
+export type PostFilters = {
   category?: number;
   tags?: number;
   page?: number;
   search?: string;
-}) {
+  // Keyset pagination: pass `pagination: 'cursor'` for the first page, then the `cursor` from `next`.
+  // Ignored with `search`: ranked results page by number, so follow `next` as-is.
+  pagination?: 'page' | 'cursor';
+  cursor?: string;
+  page_size?: number;
+  // Sparse fieldsets: only these fields (or all but `omit`), e.g. ['slug', 'updated_at'] for the sitemap.
+  fields?: string[];
+  omit?: string[];
+};
+
+export type PostPage = {
+  results: Post[];
+  next: string | null;
+  previous: string | null;
+  count?: number;
+};
+
+function buildPostsUrl(filters?: PostFilters) {
   const params = new URLSearchParams();
   if (filters?.category) params.set('category', String(filters.category));
   if (filters?.tags) params.set('tags', String(filters.tags));
   if (filters?.page) params.set('page', String(filters.page));
   if (filters?.search) params.set('search', filters.search);
+  if (filters?.pagination === 'cursor') params.set('pagination', 'cursor');
+  if (filters?.cursor) params.set('cursor', filters.cursor);
+  if (filters?.page_size) params.set('page_size', String(filters.page_size));
+  if (filters?.fields?.length) params.set('fields', filters.fields.join(','));
+  if (filters?.omit?.length) params.set('omit', filters.omit.join(','));
 
-  const url = params.toString()
+  return params.toString()
     ? `${API_BASE}/posts/?${params.toString()}`
     : `${API_BASE}/posts/`;
-  const data = await fetchJson(url, { next: { revalidate: 60 } }, 'Failed to load posts');
+}
+
+export function cursorFromUrl(url: string | null | undefined): string | undefined {
+  if (!url) return undefined;
+  return new URL(url).searchParams.get('cursor') || undefined;
+}
+
+export async function getPosts(filters?: PostFilters) {
+  const data = await fetchJson(buildPostsUrl(filters), { next: { revalidate: 60 } }, 'Failed to load posts');
   return normalizeList<Post>(data);
 }
 
+export async function getPostsPage(filters?: PostFilters): Promise<PostPage> {
+  const data: ListResponse<Post> = await fetchJson(
+    buildPostsUrl({ pagination: 'cursor', ...filters }),
+    { next: { revalidate: 60 } },
+    'Failed to load posts'
+  );
+  return {
+    results: data.results || [],
+    next: data.next ?? null,
+    previous: data.previous ?? null,
+    count: data.count,
+  };
+}
+
 export async function getPostBySlug(slug: string): Promise<Post | null> {
   try {
     const res = await fetch(`${API_BASE}/posts/${slug}/`, {
@@ -124,10 +182,35 @@ export async function getPostBySlug(slug: string): Promise<Post | null> {
   }
 }
 
+export async function getPostComments(
+  slug: string,
+  cursor?: string
+): Promise<{ results: PostComment[]; next: string | null; previous: string | null }> {
+  const url = cursor
+    ? `${API_BASE}/posts/${slug}/comments/?cursor=${encodeURIComponent(cursor)}`
+    : `${API_BASE}/posts/${slug}/comments/`;
+  const data: ListResponse<PostComment> = await fetchJson(url, { cache: 'no-store' }, 'Failed to load comments');
+  return {
+    results: data.results || [],
+    next: data.next ?? null,
+    previous: data.previous ?? null,
+  };
+}
+
 export async function getRelatedPostsForPost(post: Post, limit = 6): Promise<Post[]> {
   let related: Post[] = [];
 
-  if (post.tags && post.tags.length > 0) {
+  try {
+    related = await fetchJson(
+      `${API_BASE}/posts/${post.slug}/related/`,
+      { next: { revalidate: 300 } },
+      'Failed to load related posts'
+    );
+  } catch (error) {
+    console.error('getRelatedPostsForPost error:', error);
+  }
+
+  if (related.length === 0 && post.tags && post.tags.length > 0) {
     related = await getPosts({ tags: post.tags[0] });
   }
 
@@ -138,6 +221,65 @@ export async function getRelatedPostsForPost(post: Post, limit = 6): Promise<Pos
   return related.filter((item) => item.slug !== post.slug).slice(0, limit);
 }
 
+export type ArchivePostStub = {
+  id: number;
+  title: string;
+  slug: string;
+  created_at: string;
+};
+
+export type ArchiveBucket = {
+  year: number;
+  month: number;
+  count: number;
+  posts?: ArchivePostStub[];
+};
+
+export async function getArchive(
+  filters?: { category?: number; tags?: number; posts?: boolean; per_bucket?: number }
+): Promise<ArchiveBucket[]> {
+  const params = new URLSearchParams();
+  if (filters?.category) params.set('category', String(filters.category));
+  if (filters?.tags) params.set('tags', String(filters.tags));
+  if (filters?.posts) params.set('posts', '1');
+  if (filters?.per_bucket) params.set('per_bucket', String(filters.per_bucket));
+  const query = params.toString();
+
+  try {
+    const data = await fetchJson(
+      `${API_BASE}/archive/${query ? `?${query}` : ''}`,
+      { next: { revalidate: 60 } },
+      'Failed to load archive'
+    );
+    return data.buckets || [];
+  } catch (error) {
+    console.error('getArchive error:', error);
+    return [];
+  }
+}
+
+export type Suggestion = {
+  type: 'post' | 'tag' | 'category';
+  label: string;
+  slug: string;
+  score: number;
+};
+
+export async function getSuggestions(query: string, limit = 8): Promise<Suggestion[]> {
+  if (query.trim().length < 2) return [];
+  try {
+    const data = await fetchJson(
+      `${API_BASE}/suggest/?q=${encodeURIComponent(query)}&limit=${limit}`,
+      { next: { revalidate: 60 } },
+      'Failed to load suggestions'
+    );
+    return data.results || [];
+  } catch (error) {
+    console.error('getSuggestions error:', error);
+    return [];
+  }
+}
+
 export async function getCategories(): Promise<Category[]> {
   try {
     const data = await fetchJson(
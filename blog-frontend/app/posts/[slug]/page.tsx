@@ -17,7 +17,7 @@ export async function generateMetadata(
     return { title: 'Post topilmadi' };
   }
 
-  const plainText = post.content ? post.content.replace(/<[^>]+>/g, '') : '';
+  const plainText = post.excerpt || (post.content ? post.content.replace(/<[^>]+>/g, '') : '');
 
   return {
     title: post.seo_title || post.title,
@@ -78,6 +78,7 @@ export default async function PostPage(
                     <div>
                       <div className="font-medium">{post.author || 'Muallif'}</div>
                       <time className="text-xs block">{new Date(post.created_at).toLocaleDateString('uz-UZ')}</time>
+                      {post.reading_minutes ? <span className="text-xs block">{post.reading_minutes} daqiqa o&apos;qish</span> : null}
                     </div>
                   </div>
                 </div>
@@ -110,8 +111,21 @@ export default async function PostPage(
               ))}
             </div>
 
+            {post.toc && post.toc.length > 1 && (
+              <nav aria-label="Mundarija" className="bg-card p-4 rounded-lg mb-6">
+                <p className="font-semibold mb-2">Mundarija</p>
+                <ul className="space-y-1 text-sm">
+                  {post.toc.map((entry) => (
+                    <li key={entry.anchor} className={entry.level === 3 ? 'pl-4' : ''}>
+                      <a href={`#${entry.anchor}`} className="hover:underline">{entry.text}</a>
+                    </li>
+                  ))}
+                </ul>
+              </nav>
+            )}
+
             <div className="prose prose-blue prose-lg max-w-none text-current">
-              <div dangerouslySetInnerHTML={{ __html: DOMPurify.sanitize(post.content) }} />
+              <div dangerouslySetInnerHTML={{ __html: DOMPurify.sanitize(post.content || '') }} />
             </div>
             {adsenseSettings && (
               <div className="my-8">
@@ -122,7 +136,7 @@ export default async function PostPage(
 
           {post.comments && post.comments.length > 0 && (
             <section className="mt-12 pt-10 border-t border-border">
-              <h3 className="text-2xl font-bold mb-6">Izohlar ({post.comments.length})</h3>
+              <h3 className="text-2xl font-bold mb-6">Izohlar ({post.comment_count ?? post.comments.length})</h3>
               <div className="space-y-4">
                 {post.comments.map((comment: PostComment) => (
                   <div key={comment.id} className="bg-card p-4 rounded-lg">
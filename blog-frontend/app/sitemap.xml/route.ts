@@ -1,20 +1,36 @@
 export const dynamic = "force-dynamic";
 
-export async function GET() {
+// The backend serves a pre-generated file; keep one copy in the Next data cache.
+const REVALIDATE_SECONDS = 300;
+
+export async function GET(request: Request) {
   const backendBase = process.env.NEXT_PUBLIC_API_URL || "https://api.zuuu.uz";
   const backendUrl = `${backendBase.replace(/\/$/, "")}/sitemap.xml`;
 
-  const response = await fetch(backendUrl, { cache: "no-store" });
+  const response = await fetch(backendUrl, { next: { revalidate: REVALIDATE_SECONDS } });
 
   if (!response.ok) {
     return new Response("Failed to load sitemap", { status: 502 });
   }
 
-  const xml = await response.text();
-  return new Response(xml, {
-    headers: {
-      "Content-Type": "application/xml; charset=utf-8",
-      "Cache-Control": "no-store",
-    },
+  const headers = new Headers({
+    "Content-Type": "application/xml; charset=utf-8",
+    "Cache-Control": `public, max-age=${REVALIDATE_SECONDS}`,
   });
+  const etag = response.headers.get("etag");
+  const lastModified = response.headers.get("last-modified");
+  if (etag) headers.set("ETag", etag);
+  if (lastModified) headers.set("Last-Modified", lastModified);
+
+  // Repeat crawler fetches: answer 304 without a body.
+  const ifNoneMatch = request.headers.get("if-none-match");
+  const ifModifiedSince = request.headers.get("if-modified-since");
+  const notModified = ifNoneMatch
+    ? Boolean(etag) && ifNoneMatch.split(",").some((tag) => tag.trim() === etag || tag.trim() === "*")
+    : Boolean(ifModifiedSince && lastModified && Date.parse(lastModified) <= Date.parse(ifModifiedSince));
+  if (notModified) {
+    return new Response(null, { status: 304, headers });
+  }
+
+  return new Response(await response.text(), { headers });
 }
@@ -1,5 +1,5 @@
 import { notFound } from 'next/navigation';
-import { getPosts, getTagBySlug, getAdSenseSettings } from '../../lib/api';
+import { getPosts, getTagBySlug, getAdSenseSettings, getArchive } from '../../lib/api';
 import PostArchive from '../../components/PostArchive';
 
 export const revalidate = 60;
@@ -25,9 +25,10 @@ export default async function TagPage({ params }: { params: Promise<{ slug: stri
     notFound();
   }
 
-  const [posts, adsenseConfig] = await Promise.all([
+  const [posts, adsenseConfig, months] = await Promise.all([
     getPosts({ tags: tag.id }),
     getAdSenseSettings(),
+    getArchive({ tags: tag.id, posts: true, per_bucket: 10 }),
   ]);
 
   return (
@@ -37,6 +38,7 @@ export default async function TagPage({ params }: { params: Promise<{ slug: stri
       posts={posts}
       emptyLabel={`No posts found for #${tag.name}.`}
       adsenseConfig={adsenseConfig}
+      months={months}
     />
   );
 }
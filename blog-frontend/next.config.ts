@@ -1,6 +1,16 @@
 import type { NextConfig } from "next";
 
+const backendBase = (process.env.NEXT_PUBLIC_API_URL || "https://api.zuuu.uz").replace(/\/$/, "");
+
 const nextConfig: NextConfig = {
+  // Large sitemaps are split into /sitemap-N.xml + /sitemap_index.xml by the backend.
+  // They must live at the site root to cover every URL, so proxy them through.
+  async rewrites() {
+    return [
+      { source: "/sitemap_index.xml", destination: `${backendBase}/sitemap_index.xml` },
+      { source: "/sitemap-:number(\\d+).xml", destination: `${backendBase}/sitemap-:number.xml` },
+    ];
+  },
   images: {
     remotePatterns: [
       {
@@ -5,10 +5,12 @@ from django import forms
 from django.contrib import admin, messages
 from django.core.exceptions import PermissionDenied
 from django.http import JsonResponse
+from django.template.response import TemplateResponse
 from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 
-from .ai_services import AIGenerationError, AIGeneratedPost, generate_post_with_ai
+from .ai_batch import clean_topics, max_topics
+from .ai_services import AIGenerationError, AIGenerationInProgress, AIGeneratedPost, generate_post_with_ai
 from .models import AdSenseSettings, Category, Comment, Post, Tag
 
 logger = logging.getLogger(__name__)
@@ -68,6 +70,7 @@ class PostAdminForm(forms.ModelForm):
         self.fields["content"].required = False
         self._ai_generated_post: AIGeneratedPost | None = None
         self._ai_generated_tag_names: list[str] = []
+        self._ai_tags_attached = False
 
     @staticmethod
     def _parse_tag_names(raw_value: str) -> list[str]:
@@ -137,6 +140,7 @@ class PostAdminForm(forms.ModelForm):
                 topic=ai_topic,
                 keywords=(cleaned_data.get("ai_keywords") or "").strip() or None,
                 tone=(cleaned_data.get("ai_tone") or "").strip() or None,
+                wait=False,
             )
             self._ai_generated_tag_names = list(self._ai_generated_post.tags)
         except AIGenerationError as exc:
@@ -145,22 +149,13 @@ class PostAdminForm(forms.ModelForm):
         return cleaned_data
 
     def _attach_ai_tags(self, instance: Post):
-        if not self._ai_generated_tag_names:
+        # Called from save(commit=True) and PostAdmin.save_related; attach only once.
+        if not self._ai_generated_tag_names or self._ai_tags_attached:
             return
-        tag_objects = []
-        for tag_name in self._ai_generated_tag_names:
-            existing = Tag.objects.filter(name__iexact=tag_name).first()
-            if existing:
-                tag_objects.append(existing)
-                continue
-            tag_objects.append(
-                Tag.objects.create(
-                    name=tag_name,
-                    created_by=instance.author,
-                )
-            )
+        tag_objects = Tag.objects.resolve_names(self._ai_generated_tag_names, created_by=instance.author)
         if tag_objects:
             instance.tags.add(*tag_objects)
+        self._ai_tags_attached = True
 
     def save(self, commit=True):
         instance: Post = super().save(commit=False)
@@ -195,10 +190,11 @@ class PostAdmin(admin.ModelAdmin):
         "category",
         "author",
         "is_indexable",
+        "is_draft",
         "created_at",
     )
 
-    list_filter = ("category", "is_indexable", "created_at")
+    list_filter = ("category", "is_draft", "is_indexable", "created_at")
     search_fields = ("title", "seo_title", "seo_description")
 
     prepopulated_fields = {
@@ -219,7 +215,7 @@ class PostAdmin(admin.ModelAdmin):
                 )
             },
         ),
-        ("Asosiy", {"fields": ("title", "slug", "category", "tags", "author")}),
+        ("Asosiy", {"fields": ("title", "slug", "category", "tags", "author", "is_draft")}),
         ("Kontent", {"fields": ("content", "featured_image")}),
         (
             "SEO (Google)",
@@ -252,6 +248,11 @@ class PostAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.ai_generate_view),
                 name="blog_post_ai_generate",
             ),
+            path(
+                "ai-generate-batch/",
+                self.admin_site.admin_view(self.ai_generate_batch_view),
+                name="blog_post_ai_generate_batch",
+            ),
         ]
         return custom_urls + urls
 
@@ -641,6 +642,7 @@ class PostAdmin(admin.ModelAdmin):
         keywords = str(payload.get("keywords") or "").strip() or None
         tone = str(payload.get("tone") or "").strip() or None
         use_sync = bool(payload.get("sync"))
+        refresh = bool(payload.get("refresh"))
 
         if not topic:
             return JsonResponse(
@@ -663,7 +665,10 @@ class PostAdmin(admin.ModelAdmin):
 
         if use_sync:
             try:
-                generated = generate_post_with_ai(topic=topic, keywords=keywords, tone=tone)
+                # Bir xil generatsiya ketayotgan bo'lsa, so'rovni ushlab turmaymiz (wait=False)
+                generated = generate_post_with_ai(
+                    topic=topic, keywords=keywords, tone=tone, refresh=refresh, wait=False
+                )
                 return JsonResponse(
                     {
                         "success": True,
@@ -677,6 +682,18 @@ class PostAdmin(admin.ModelAdmin):
                     },
                     status=200,
                 )
+            except AIGenerationInProgress as exc:
+                from .tasks import running_generation_task
+
+                # Sinxron mijoz 200 = tayyor kontent deb kutadi: 409 + ketayotgan task_id (bo'lsa)
+                return JsonResponse(
+                    {
+                        "error": str(exc),
+                        "task_id": running_generation_task(topic, keywords, tone),
+                        "hint": "Retry in a moment to get the finished result, or poll the task status.",
+                    },
+                    status=409,
+                )
             except AIGenerationError as exc:
                 return JsonResponse(
                     {
@@ -696,22 +713,28 @@ class PostAdmin(admin.ModelAdmin):
                 )
 
         try:
-            from .tasks import generate_post_async
-            
-            # Dispatch async task
-            task = generate_post_async.delay(
+            from .tasks import start_generation_task
+
+            # Bir xil so'rov allaqachon navbatda bo'lsa, o'sha task_id qaytariladi
+            task_id, shared = start_generation_task(
                 topic=topic,
                 keywords=keywords,
                 tone=tone,
                 category_id=payload.get("category_id"),
                 author_id=request.user.id if request.user.is_authenticated else None,
+                refresh=refresh,
             )
-            
+
             return JsonResponse(
                 {
                     "success": True,
-                    "task_id": task.id,
-                    "message": "Post generation started in background. Check status for completion.",
+                    "task_id": task_id,
+                    "shared": shared,
+                    "message": (
+                        "An identical generation is already running; following its task."
+                        if shared
+                        else "Post generation started in background. Check status for completion."
+                    ),
                 },
                 status=202,
             )
@@ -725,6 +748,96 @@ class PostAdmin(admin.ModelAdmin):
                 status=500,
             )
 
+    def ai_generate_batch_view(self, request):
+        """Ko'p mavzu bo'yicha qoralama postlar: GET sahifa, POST JSON -> task_id (blog/ai_batch.py)"""
+        if not self.has_add_permission(request):
+            raise PermissionDenied("You do not have permission to generate AI content.")
+
+        if request.method != "POST":
+            context = {
+                **self.admin_site.each_context(request),
+                "opts": self.model._meta,
+                "title": "Generate AI drafts",
+                "tone_choices": PostAdminForm.AI_TONE_CHOICES,
+                "categories": Category.objects.order_by("name").values("id", "name"),
+                "max_topics": max_topics(),
+                "generate_url": reverse("admin:blog_post_ai_generate_batch"),
+            }
+            return TemplateResponse(request, "admin/blog/post/ai_generate_batch.html", context)
+
+        try:
+            payload = json.loads(request.body.decode("utf-8"))
+        except json.JSONDecodeError:
+            return JsonResponse(
+                {
+                    "error": "Invalid JSON payload.",
+                    "hint": "Send JSON with topics, optional keywords, tone and category_id.",
+                },
+                status=400,
+            )
+
+        raw_topics = payload.get("topics") or []
+        if isinstance(raw_topics, str):
+            raw_topics = raw_topics.splitlines()
+        topics = clean_topics(raw_topics if isinstance(raw_topics, list) else [])
+        keywords = str(payload.get("keywords") or "").strip() or None
+        tone = str(payload.get("tone") or "").strip() or None
+        category_id = str(payload.get("category_id") or "").strip() or None
+
+        if not topics:
+            return JsonResponse(
+                {"error": "At least one topic is required.", "hint": "Enter one topic per line."},
+                status=400,
+            )
+        if len(topics) > max_topics():
+            return JsonResponse(
+                {"error": f"Too many topics ({len(topics)}).", "hint": f"At most {max_topics()} per batch."},
+                status=400,
+            )
+        valid_tones = {choice[0] for choice in PostAdminForm.AI_TONE_CHOICES}
+        if tone and tone not in valid_tones:
+            return JsonResponse(
+                {"error": "Invalid AI tone.", "hint": "Allowed tones: academic, friendly, expert."},
+                status=400,
+            )
+        if category_id is not None:
+            category_id = int(category_id) if category_id.isdigit() else None
+            if category_id is None or not Category.objects.filter(pk=category_id).exists():
+                return JsonResponse(
+                    {"error": "Invalid category.", "hint": "Pick an existing category."},
+                    status=400,
+                )
+
+        try:
+            from .tasks import generate_posts_batch_async
+
+            task = generate_posts_batch_async.delay(
+                topics=topics,
+                keywords=keywords,
+                tone=tone,
+                category_id=category_id,
+                author_id=request.user.id,
+                refresh=bool(payload.get("refresh")),
+            )
+        except Exception:
+            logger.exception("Unexpected error in admin AI batch generation endpoint.")
+            return JsonResponse(
+                {
+                    "error": "Failed to start batch generation.",
+                    "hint": "Ensure Celery and Redis are running. Check backend logs.",
+                },
+                status=500,
+            )
+        return JsonResponse(
+            {
+                "success": True,
+                "task_id": task.id,
+                "topics": topics,
+                "message": f"Generating {len(topics)} draft post(s) in background.",
+            },
+            status=202,
+        )
+
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
         if form.cleaned_data.get("generation_mode") == PostAdminForm.GENERATION_MODE_AI:
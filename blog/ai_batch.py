@@ -0,0 +1,168 @@
+"""
+Batch AI generation: many topics in one Celery task.
+
+Topics are generated by a thread pool of AI_BATCH_CONCURRENCY workers
+(the OpenAI client is blocking I/O, so threads overlap the waits), with
+OpenAI request starts -- retries and expansion calls included -- spaced
+to AI_BATCH_RATE_PER_MINUTE across all workers. Each topic goes through
+generate_post_with_ai, so topics already cached or in flight elsewhere
+cost no extra OpenAI request and don't wait for the limiter.
+
+Finished posts are saved as drafts (Post.is_draft) in groups through
+ingest_posts: one bulk INSERT per group, tags resolved set-wise and the
+derived data queued in the outbox once. Drafts stay off the public API
+and sitemap until an editor publishes them.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .ai_services import AIGenerationError, generate_post_with_ai
+from .ingest import ingest_posts
+
+logger = logging.getLogger(__name__)
+
+# Per-topic states reported in the progress payload
+PENDING, RUNNING, GENERATED, SAVED, FAILED = "pending", "running", "generated", "saved", "failed"
+
+
+def max_topics():
+    return getattr(settings, "AI_BATCH_MAX_TOPICS", 50)
+
+
+def concurrency():
+    return max(1, getattr(settings, "AI_BATCH_CONCURRENCY", 4))
+
+
+def rate_per_minute():
+    return getattr(settings, "AI_BATCH_RATE_PER_MINUTE", 20)
+
+
+def save_batch_size():
+    return max(1, getattr(settings, "AI_BATCH_SAVE_SIZE", 10))
+
+
+class RateLimiter:
+    """Space call starts at least 60/rate seconds apart, shared by all threads (rate <= 0: no limit)."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def clean_topics(topics):
+    """Stripped topics without blanks or case-insensitive duplicates, in input order."""
+    seen, cleaned = set(), []
+    for topic in topics:
+        topic = " ".join(str(topic or "").split())
+        if topic and topic.casefold() not in seen:
+            seen.add(topic.casefold())
+            cleaned.append(topic)
+    return cleaned
+
+
+def _draft_item(generated, category_id):
+    return {
+        "title": generated.title,
+        "content": generated.content,
+        "seo_title": generated.seo_title,
+        "seo_description": generated.seo_description,
+        "seo_keywords": generated.seo_keywords,
+        "category": category_id,
+        "tags": [],
+        "tag_names": generated.tags,
+        "is_draft": True,
+    }
+
+
+def generate_drafts(topics, *, keywords=None, tone=None, category_id=None, author=None,
+                    refresh=False, on_progress=None):
+    """
+    Generate a draft post per topic. Returns one dict per topic
+    ({topic, status, post_id, slug, title, error}); `on_progress(items)`
+    is called after every completed topic and every few seconds meanwhile.
+    """
+    items = [
+        {"topic": topic, "status": PENDING, "post_id": None, "slug": None, "title": None, "error": None}
+        for topic in topics
+    ]
+    limiter = RateLimiter(rate_per_minute())
+
+    def report():
+        if on_progress is not None:
+            on_progress(items)
+
+    def generate(item):
+        item["status"] = RUNNING
+        try:
+            return generate_post_with_ai(
+                topic=item["topic"], keywords=keywords, tone=tone, refresh=refresh, before_request=limiter.wait
+            )
+        finally:
+            # A database cache backend opens a connection per worker thread; don't leak it.
+            connection.close()
+
+    pending_saves = []
+
+    def save_pending():
+        if not pending_saves:
+            return
+        batch = pending_saves[:]
+        pending_saves.clear()
+        try:
+            posts = ingest_posts([_draft_item(generated, category_id) for _, generated in batch], author=author)
+        except Exception as exc:
+            logger.exception("Saving %d AI draft(s) failed", len(batch))
+            for item, _ in batch:
+                item.update(status=FAILED, error=f"Could not save draft: {exc}")
+            return
+        for (item, _), post in zip(batch, posts):
+            item.update(status=SAVED, post_id=post.pk, slug=post.slug, title=post.title)
+
+    report()
+    with ThreadPoolExecutor(max_workers=concurrency(), thread_name_prefix="ai-batch") as pool:
+        running = {pool.submit(generate, item): item for item in items}
+        while running:
+            done, _ = wait(running, timeout=5, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = running.pop(future)
+                try:
+                    pending_saves.append((item, future.result()))
+                    item["status"] = GENERATED
+                except AIGenerationError as exc:
+                    item.update(status=FAILED, error=str(exc))
+                except Exception:
+                    logger.exception("AI batch generation failed for topic '%s'", item["topic"])
+                    item.update(status=FAILED, error="Unexpected error during AI generation.")
+            if len(pending_saves) >= save_batch_size() or not running:
+                save_pending()
+            report()
+    return items
+
+
+def summarize(items):
+    """Progress payload: per-state counts plus the per-topic list."""
+    counts = {state: 0 for state in (PENDING, RUNNING, GENERATED, SAVED, FAILED)}
+    for item in items:
+        counts[item["status"]] += 1
+    return {
+        "total": len(items),
+        "done": counts[SAVED] + counts[FAILED],
+        **counts,
+        "topics": [dict(item) for item in items],
+    }
@@ -1,22 +1,35 @@
+import hashlib
 import json
 import logging
 import re
-from dataclasses import dataclass
-from typing import Optional
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
 
 from django.conf import settings
+from django.core.cache import cache
 from openai import AuthenticationError, OpenAI
 
+from .content import analyze_html
+
 logger = logging.getLogger(__name__)
 MIN_WORDS = 1200
 MAX_WORDS = 1800
 TARGET_WORDS = 1400
+# Part of the generation cache key: bump whenever the prompts or validation rules change.
+PROMPT_VERSION = "1"
+GENERATION_CACHE_PREFIX = "aigen"
 
 
 class AIGenerationError(Exception):
     """Raised when AI post generation fails."""
 
 
+class AIGenerationInProgress(AIGenerationError):
+    """Raised instead of waiting when an identical generation is already running (wait=False)."""
+
+
 @dataclass(frozen=True)
 class AIGeneratedPost:
     title: str
@@ -41,8 +54,8 @@ def _truncate(value: str, max_length: int) -> str:
 
 
 def _word_count_from_html(html: str) -> int:
-    text = re.sub(r"<[^>]+>", " ", html)
-    return len(re.findall(r"\b[\w'-]+\b", text))
+    # Same counter Post.save stores, so validation and the stored word_count agree.
+    return analyze_html(html).word_count
 
 
 def _normalize_tags(raw_tags: object, fallback_keywords: str = "") -> list[str]:
@@ -146,7 +159,10 @@ def _request_payload(
     client: OpenAI,
     model: str,
     user_prompt: str,
+    before_request: Optional[Callable[[], None]] = None,
 ) -> dict:
+    if before_request is not None:
+        before_request()
     response = client.chat.completions.create(
         model=model,
         temperature=0.2,
@@ -210,11 +226,115 @@ def _validate_generated(generated: AIGeneratedPost, topic: str) -> tuple[bool, s
     return True, "", word_count
 
 
+def _normalize_text(value: Optional[str]) -> str:
+    return " ".join(str(value or "").split()).casefold()
+
+
+def generation_key(topic: str, keywords: Optional[str] = None, tone: Optional[str] = None) -> str:
+    """
+    Cache identity of a generation request: normalized topic, keyword set
+    (order/case/whitespace-insensitive), tone, model and PROMPT_VERSION.
+    """
+    parts = {
+        "topic": _normalize_text(topic),
+        "keywords": sorted({_normalize_text(k) for k in (keywords or "").split(",") if k.strip()}),
+        "tone": _normalize_text(tone) or "expert",
+        "model": getattr(settings, "OPENAI_MODEL", "gpt-4.1-mini"),
+        "prompt": PROMPT_VERSION,
+    }
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _cache_ttl() -> int:
+    return int(getattr(settings, "AI_GENERATION_CACHE_TTL", 24 * 60 * 60))
+
+
+def _lock_timeout() -> int:
+    # Worst case of one uncached generation: every attempt plus its expansion call.
+    default = float(getattr(settings, "OPENAI_TIMEOUT_SECONDS", 60)) * 2 * int(
+        getattr(settings, "OPENAI_GENERATION_MAX_ATTEMPTS", 3)
+    ) + 30
+    return int(getattr(settings, "AI_GENERATION_LOCK_TIMEOUT", default))
+
+
+def _result_key(key: str) -> str:
+    return f"{GENERATION_CACHE_PREFIX}:result:{key}"
+
+
+def _lock_key(key: str) -> str:
+    return f"{GENERATION_CACHE_PREFIX}:lock:{key}"
+
+
+def _cached_result(key: str) -> Optional[AIGeneratedPost]:
+    """Cached post, None on a miss; re-raises a recently cached failure."""
+    cached = cache.get(_result_key(key))
+    if cached is None:
+        return None
+    if "error" in cached:
+        raise AIGenerationError(cached["error"])
+    return AIGeneratedPost(**cached)
+
+
 def generate_post_with_ai(
     *,
     topic: str,
     keywords: Optional[str] = None,
     tone: Optional[str] = None,
+    refresh: bool = False,
+    wait: bool = True,
+    before_request: Optional[Callable[[], None]] = None,
+) -> AIGeneratedPost:
+    """
+    Cached, single-flight generate: identical requests (generation_key)
+    within AI_GENERATION_CACHE_TTL reuse the stored post. While one caller
+    is generating, concurrent identical callers wait for its result
+    instead of calling OpenAI themselves; with `wait=False` they get
+    AIGenerationInProgress at once. `refresh` skips the cache read.
+    `before_request` is called before every OpenAI request (rate limiting).
+    """
+    key = generation_key(topic, keywords, tone)
+    if not refresh:
+        cached = _cached_result(key)
+        if cached is not None:
+            logger.info("AI generation cache hit for topic '%s'", topic)
+            return cached
+
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + _lock_timeout()
+    while not cache.add(_lock_key(key), token, timeout=_lock_timeout()):
+        # Someone else is generating the same post: wait for it to finish and share its result.
+        if not wait:
+            raise AIGenerationInProgress("An identical AI generation is already running. Please try again shortly.")
+        if time.monotonic() > deadline:
+            raise AIGenerationError("An identical AI generation is still running. Please try again shortly.")
+        time.sleep(0.5)
+        if cache.get(_lock_key(key)) is None:
+            cached = _cached_result(key)
+            if cached is not None:
+                return cached
+
+    try:
+        generated = _generate_uncached(topic=topic, keywords=keywords, tone=tone, before_request=before_request)
+    except AIGenerationError as exc:
+        # Short negative cache so waiters (and double clicks) share the failure.
+        failure_ttl = int(getattr(settings, "AI_GENERATION_FAILURE_TTL", 30))
+        cache.set(_result_key(key), {"error": str(exc)}, timeout=failure_ttl)
+        raise
+    else:
+        cache.set(_result_key(key), asdict(generated), timeout=_cache_ttl())
+        return generated
+    finally:
+        if cache.get(_lock_key(key)) == token:
+            cache.delete(_lock_key(key))
+
+
+def _generate_uncached(
+    *,
+    topic: str,
+    keywords: Optional[str] = None,
+    tone: Optional[str] = None,
+    before_request: Optional[Callable[[], None]] = None,
 ) -> AIGeneratedPost:
     api_key = str(getattr(settings, "OPENAI_API_KEY", "")).strip().strip('"').strip("'")
     if not api_key:
@@ -238,7 +358,9 @@ def generate_post_with_ai(
                 tone=tone_value,
                 correction_note=correction_note,
             )
-            payload = _request_payload(client=client, model=model, user_prompt=user_prompt)
+            payload = _request_payload(
+                client=client, model=model, user_prompt=user_prompt, before_request=before_request
+            )
             generated = _parse_generated_payload(payload, topic)
             is_valid, validation_error, word_count = _validate_generated(generated, topic)
             if is_valid:
@@ -256,6 +378,7 @@ def generate_post_with_ai(
                     client=client,
                     model=model,
                     user_prompt=expansion_prompt,
+                    before_request=before_request,
                 )
                 expanded_generated = _parse_generated_payload(expanded_payload, topic)
                 expanded_valid, expanded_error, expanded_wc = _validate_generated(expanded_generated, topic)
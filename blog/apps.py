@@ -7,6 +7,7 @@ class BlogConfig(AppConfig):
     name = 'blog'
 
     def ready(self):
+        from . import checks  # noqa: F401
         # import signals to register them
         try:
             from . import signals  # noqa: F401
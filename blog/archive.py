@@ -0,0 +1,47 @@
+"""
+Year/month archive for /api/archive/.
+
+Counts come from one TruncMonth GROUP BY over created_at. Post stubs,
+when requested, come from one more query that numbers posts within each
+month (ROW_NUMBER() OVER (PARTITION BY month)) so at most `per_bucket`
+rows per month leave the database.
+"""
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber, TruncMonth
+
+STUB_FIELDS = ("id", "title", "slug", "created_at")
+
+
+def archive_buckets(queryset, with_posts=False, per_bucket=None):
+    """[{year, month, count[, posts]}] newest month first."""
+    queryset = queryset.order_by()
+    counts = (
+        queryset.annotate(month=TruncMonth("created_at"))
+        .values("month")
+        .annotate(count=Count("pk"))
+        .order_by("-month")
+    )
+    buckets = [
+        {"year": row["month"].year, "month": row["month"].month, "count": row["count"]}
+        for row in counts
+    ]
+    if not with_posts or not buckets:
+        return buckets
+
+    stubs = queryset.annotate(month=TruncMonth("created_at"))
+    if per_bucket:
+        stubs = stubs.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("month")],
+                order_by=[F("created_at").desc(), F("id").desc()],
+            )
+        ).filter(position__lte=per_bucket)
+
+    by_month = {(bucket["year"], bucket["month"]): bucket for bucket in buckets}
+    for bucket in buckets:
+        bucket["posts"] = []
+    for row in stubs.order_by("-created_at", "-id").values("month", *STUB_FIELDS):
+        month = row.pop("month")
+        by_month[(month.year, month.month)]["posts"].append(row)
+    return buckets
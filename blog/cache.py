@@ -0,0 +1,129 @@
+"""
+Read-through cache for anonymous GET responses of the public API.
+
+Entries are keyed by scheme + host + path + normalized query params +
+negotiated media type (bodies carry absolute URLs: pagination links,
+image URLs), and tagged with one or more namespace versions. Invalidation bumps
+a namespace version (O(1), works on every backend), which orphans every
+entry built against the old version; orphans simply expire. The bump
+time is recorded too, so conditional GET (blog/conditional.py) can
+advance Last-Modified on changes no updated_at column reflects (deletes,
+comment removals, category/tag renames).
+
+Namespaces:
+    posts               post list pages
+    post:<slug>         one post detail
+    post-relations      tag/category data embedded in every post detail
+    categories, tags    category / tag endpoints
+    archive             /api/archive/ month buckets
+"""
+from datetime import datetime, timezone
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+VERSION_KEY = "apicache:v:{}"
+ENTRY_KEY = "apicache:e:{}"
+BUMPED_KEY = "apicache:t:{}"
+
+
+def _cache():
+    return caches[getattr(settings, "API_CACHE_ALIAS", "default")]
+
+
+def _timeout():
+    return getattr(settings, "API_CACHE_TIMEOUT", 300)
+
+
+def namespace_version(namespace):
+    cache = _cache()
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key) or 1
+    return version
+
+
+def bump(*namespaces):
+    cache = _cache()
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+    if namespaces:
+        now = time.time()
+        cache.set_many({BUMPED_KEY.format(namespace): now for namespace in namespaces}, timeout=None)
+
+
+def last_bumped(*namespaces):
+    """Latest bump time of the namespaces as an aware datetime; None if never bumped."""
+    stamps = _cache().get_many([BUMPED_KEY.format(namespace) for namespace in namespaces]).values()
+    return datetime.fromtimestamp(max(stamps), tz=timezone.utc) if stamps else None
+
+
+def normalized_query(request):
+    items = []
+    for key in sorted(request.query_params.keys()):
+        for value in sorted(request.query_params.getlist(key)):
+            if value != "":
+                items.append((key, value))
+    return urlencode(items)
+
+
+def cache_key(request, namespaces):
+    versions = ",".join(f"{ns}={namespace_version(ns)}" for ns in namespaces)
+    media_type = getattr(request, "accepted_media_type", "") or ""
+    # Absolute URLs in the body depend on the host the request came in on
+    origin = f"{request.scheme}://{request.get_host()}"
+    raw = f"{origin}{request.path}?{normalized_query(request)}|{media_type}|{versions}"
+    return ENTRY_KEY.format(hashlib.md5(raw.encode("utf-8")).hexdigest())
+
+
+def is_cacheable(request):
+    return (
+        getattr(settings, "API_CACHE_ENABLED", True)
+        and request.method == "GET"
+        and not (request.user and request.user.is_authenticated)
+    )
+
+
+class AnonymousResponseCacheMixin:
+    """
+    ViewSet mixin: serve list/retrieve for anonymous users from the cache.
+    Stores response.data, so a hit skips the ORM and the serializers.
+    """
+    cache_namespaces = ()
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        if not is_cacheable(request):
+            return handler(request, *args, **kwargs)
+
+        cache = _cache()
+        key = cache_key(request, self.get_cache_namespaces())
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, _timeout())
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,41 @@
+"""
+System checks for deployment settings the blog app relies on.
+
+The outbox drain debounce, the sitemap dirty flag and lock, the API cache
+namespace bumps and the AI generation single-flight lock all live in the
+default cache and are shared between web processes and Celery workers.
+A per-process cache (LocMemCache) silently breaks them: a bump made by a
+worker never reaches the web process, and a debounce key set by the web
+process is never cleared by the worker.
+
+Development and tests use the same process-local default on purpose, so
+the check only runs with `manage.py check --deploy`.
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+        # Tasks run in the calling process: nothing to share
+        return []
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f"The default cache ({backend.rsplit('.', 1)[-1]}) is not shared between "
+            "web processes and Celery workers.",
+            hint=(
+                "Set REDIS_CACHE_URL (the broker's Redis works), or CELERY_TASK_ALWAYS_EAGER=1 "
+                "to run tasks in-process for single-process development."
+            ),
+            id="blog.W001",
+        )
+    ]
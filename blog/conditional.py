@@ -0,0 +1,107 @@
+"""
+Conditional GET (ETag / Last-Modified) for post endpoints.
+
+Validators are computed from one small aggregate query plus the cache
+namespace versions from blog/cache.py (bumped on every write that changes
+the representation), never by serializing the response. A matching
+If-None-Match / If-Modified-Since gets a 304 before the view does any
+real work.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import last_bumped, namespace_version, normalized_query
+
+
+def make_etag(*parts):
+    raw = "|".join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode("utf-8")).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin. Subclasses implement get_list_validators() and
+    get_detail_validators(), each returning (etag, last_modified datetime)
+    or None when validators can't be computed (e.g. object not found).
+    """
+
+    def get_list_validators(self, request):
+        return None
+
+    def get_detail_validators(self, request):
+        return None
+
+    def _conditional(self, handler, validators_getter, request, *args, **kwargs):
+        validators = validators_getter(request) if request.method in ("GET", "HEAD") else None
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, self.get_list_validators, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, self.get_detail_validators, request, *args, **kwargs)
+
+
+def _latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def post_list_validators(request, queryset):
+    """Per-filter max(updated_at) + row count + 'posts' namespace version."""
+    aggregate = queryset.order_by().aggregate(last_modified=Max("updated_at"), total=Count("pk"))
+    etag = make_etag(
+        request.path,
+        normalized_query(request),
+        getattr(request, "accepted_media_type", ""),
+        aggregate["last_modified"].isoformat() if aggregate["last_modified"] else "-",
+        aggregate["total"],
+        namespace_version("posts"),
+    )
+    # Deletes and comment/category/tag changes don't touch updated_at, but do bump 'posts'.
+    return etag, _latest(aggregate["last_modified"], last_bumped("posts"))
+
+
+def post_detail_validators(request, queryset, slug):
+    """updated_at, comment count and latest comment time of one post."""
+    row = (
+        queryset.filter(slug=slug)
+        .order_by()
+        .annotate(last_comment_at=Max("comments__created_at"))
+        .values("pk", "updated_at", "comment_count", "last_comment_at")
+        .first()
+    )
+    if row is None:
+        return None
+
+    last_modified = _latest(
+        row["updated_at"], row["last_comment_at"], last_bumped(f"post:{slug}", "post-relations")
+    )
+    etag = make_etag(
+        row["pk"],
+        row["updated_at"].isoformat(),
+        row["comment_count"],
+        row["last_comment_at"].isoformat() if row["last_comment_at"] else "-",
+        normalized_query(request),
+        getattr(request, "accepted_media_type", ""),
+        namespace_version(f"post:{slug}"),
+        namespace_version("post-relations"),
+    )
+    return etag, last_modified
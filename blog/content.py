@@ -0,0 +1,165 @@
+"""
+Derived content artifacts, computed at write time from one HTML parse.
+
+analyze_html() walks the article body once and returns the word count,
+reading minutes, a plain-text excerpt and an H2/H3 outline. Headings
+without an id get a stable slug anchor spliced into the HTML, so the
+outline links work against the stored content (existing ids are kept,
+which makes re-saving idempotent).
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.utils.text import slugify
+
+# Post columns written by Post.refresh_content_artifacts() (content gains heading ids)
+ARTIFACT_FIELDS = ("content", "word_count", "reading_minutes", "excerpt", "toc")
+
+WORD_RE = re.compile(r"\b[\w'-]+\b")
+NEWLINE_RE = re.compile("\n")
+# An id attribute directly on an H2/H3 start tag (where analyze_html() puts anchors)
+HEADING_ID_RE = re.compile(r'(<h[23])\s+id="[^"]*"', re.IGNORECASE)
+SPACE_RE = re.compile(r"\s+")
+HEADING_TAGS = {"h2": 2, "h3": 3}
+TITLE_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+SKIP_TAGS = {"script", "style", "template"}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption",
+    "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "ol", "p",
+    "pre", "section", "table", "td", "th", "tr", "ul",
+}
+
+
+def words_per_minute():
+    return getattr(settings, "READING_WORDS_PER_MINUTE", 200)
+
+
+def excerpt_length():
+    return getattr(settings, "POST_EXCERPT_LENGTH", 200)
+
+
+def count_words(text):
+    return len(WORD_RE.findall(text))
+
+
+def truncate_text(text, length):
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1].rsplit(" ", 1)[0].rstrip(" ,.;:-")
+    return f"{cut}…"
+
+
+@dataclass
+class ContentArtifacts:
+    html: str
+    word_count: int = 0
+    reading_minutes: int = 0
+    excerpt: str = ""
+    toc: list = field(default_factory=list)
+
+
+class _ArticleParser(HTMLParser):
+    def __init__(self, source):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        # getpos() counts "\n" only; str.splitlines() would also break on \r, \x0c, U+2028, ...
+        self.line_offsets = [0] + [match.end() for match in NEWLINE_RE.finditer(source)]
+        self.text = []
+        self.body = []  # text outside headings, for the excerpt
+        self.skip_depth = 0
+        self.title_depth = 0
+        self.heading = None  # (level, id or None, insert offset, text parts)
+        self.headings = []
+
+    def _separate(self):
+        self.text.append(" ")
+        self.body.append(" ")
+
+    def _offset(self):
+        line, column = self.getpos()
+        return self.line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        if tag in TITLE_TAGS:
+            self.title_depth += 1
+        if tag in BLOCK_TAGS:
+            self._separate()
+        if tag in HEADING_TAGS and self.heading is None:
+            # Insert point for ` id="..."`: right after "<h2"
+            offset = self._offset() + 1 + len(tag)
+            if self.source[offset - len(tag) - 1:offset].lower() != f"<{tag}":
+                offset = None  # never splice into anything but the tag itself
+            self.heading = (HEADING_TAGS[tag], dict(attrs).get("id"), offset, [])
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._separate()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        if tag in TITLE_TAGS and self.title_depth:
+            self.title_depth -= 1
+        if tag in BLOCK_TAGS:
+            self._separate()
+        if tag in HEADING_TAGS and self.heading is not None:
+            level, anchor, offset, parts = self.heading
+            self.headings.append((level, anchor, offset, SPACE_RE.sub(" ", "".join(parts)).strip()))
+            self.heading = None
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.text.append(data)
+        if not self.title_depth:
+            self.body.append(data)
+        if self.heading is not None:
+            self.heading[3].append(data)
+
+
+def analyze_html(html):
+    """Single pass over `html`; returns ContentArtifacts with anchored HTML."""
+    html = html or ""
+    parser = _ArticleParser(html)
+    parser.feed(html)
+    parser.close()
+
+    words = count_words("".join(parser.text))
+    body = SPACE_RE.sub(" ", "".join(parser.body)).strip()
+
+    used = {anchor for _, anchor, _, _ in parser.headings if anchor}
+    toc, inserts = [], []
+    for level, anchor, offset, title in parser.headings:
+        if not title:
+            continue
+        if not anchor and offset is not None:
+            base = slugify(title)[:60].strip("-") or "section"
+            anchor, counter = base, 2
+            while anchor in used:
+                anchor = f"{base}-{counter}"
+                counter += 1
+            used.add(anchor)
+            inserts.append((offset, f' id="{anchor}"'))
+        if anchor:
+            toc.append({"level": level, "text": title, "anchor": anchor})
+
+    for offset, attribute in reversed(inserts):
+        html = f"{html[:offset]}{attribute}{html[offset:]}"
+
+    return ContentArtifacts(
+        html=html,
+        word_count=words,
+        reading_minutes=math.ceil(words / words_per_minute()) if words else 0,
+        excerpt=truncate_text(body, excerpt_length()),
+        toc=toc,
+    )
+
+
+def only_anchors_added(before, after):
+    """True when `after` is `before` plus heading ids and nothing else."""
+    return HEADING_ID_RE.sub(r"\1", before or "") == HEADING_ID_RE.sub(r"\1", after or "")
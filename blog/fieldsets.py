@@ -0,0 +1,135 @@
+"""
+Sparse fieldsets: `?fields=title,slug` and `?omit=content` on list/retrieve.
+
+The view resolves the requested names against its serializer class, hands
+them to the serializer (which drops every other field) and trims the
+queryset to the columns, select_related joins and prefetches the kept
+fields actually read. Unknown names are a 400, so typos don't silently
+return empty objects.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+READ_METHODS = ("GET", "HEAD")
+
+
+def _names(request, param):
+    raw = ",".join(request.query_params.getlist(param))
+    return [name.strip() for name in raw.split(",") if name.strip()]
+
+
+def _prefetch_through(lookup):
+    return getattr(lookup, "prefetch_through", lookup).split("__")[0]
+
+
+def restrict_queryset(queryset, lookups):
+    """
+    Load only what the given ORM lookups (e.g. "title", "author__username",
+    "tags") need: .only() columns, select_related joins for forward relations
+    and the existing prefetches of reverse/many-to-many relations.
+    Returns the queryset unchanged if a lookup isn't a model field.
+    """
+    opts = queryset.model._meta
+    columns, joins, prefetches = set(), set(), set()
+    for lookup in lookups:
+        parts = lookup.split("__")
+        try:
+            field = opts.get_field(parts[0])
+        except FieldDoesNotExist:
+            return queryset
+        if field.many_to_many or field.one_to_many:
+            prefetches.add(parts[0])
+        elif field.is_relation and len(parts) > 1:
+            joins.add("__".join(parts[:-1]))
+            columns.add(lookup)
+        else:
+            columns.add(parts[0])
+
+    kept = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if _prefetch_through(lookup) in prefetches
+    ]
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if joins:
+        queryset = queryset.select_related(*sorted(joins))
+    if kept:
+        queryset = queryset.prefetch_related(*kept)
+    return queryset.only(*sorted(columns))
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer mixin: `fields=` / `omit=` constructor kwargs drop the other fields.
+    `method_field_sources` maps computed fields (SerializerMethodField or a
+    custom get_attribute) to the ORM lookups they read.
+    """
+    method_field_sources = {}
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and not omit:
+            return
+        keep = set(self.fields if fields is None else fields) - set(omit or ())
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+    @classmethod
+    def lookups_for(cls, names):
+        fields = cls().fields
+        lookups = set()
+        for name in names:
+            source = fields[name].source
+            if name in cls.method_field_sources:
+                lookups.update(cls.method_field_sources[name])
+            elif source != "*":
+                lookups.add(source.replace(".", "__"))
+        return lookups
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin. Call trim_queryset() at the end of get_queryset();
+    get_serializer() passes the resolved fieldset to the serializer.
+    `fieldset_required` lists lookups always loaded (e.g. cursor ordering).
+    """
+    fieldset_actions = ("list", "retrieve")
+    fieldset_required = ()
+
+    def get_fieldset(self):
+        """Kept serializer field names in declaration order, or None when not requested."""
+        if self.request.method not in READ_METHODS or self.action not in self.fieldset_actions:
+            return None
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = self._resolve_fieldset()
+        return self._fieldset
+
+    def _resolve_fieldset(self):
+        fields = _names(self.request, FIELDS_PARAM)
+        omit = _names(self.request, OMIT_PARAM)
+        if not fields and not omit:
+            return None
+
+        available = list(self.get_serializer_class()().fields)
+        unknown = sorted(set(fields + omit) - set(available))
+        if unknown:
+            raise ValidationError({
+                FIELDS_PARAM: f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}."
+            })
+        keep = set(fields) if fields else set(available)
+        return [name for name in available if name in keep and name not in omit]
+
+    def get_serializer(self, *args, **kwargs):
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            kwargs.setdefault("fields", fieldset)
+        return super().get_serializer(*args, **kwargs)
+
+    def trim_queryset(self, queryset):
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return queryset
+        lookups = self.get_serializer_class().lookups_for(fieldset)
+        return restrict_queryset(queryset, lookups | set(self.fieldset_required))
@@ -0,0 +1,130 @@
+"""
+Bulk post ingestion: /api/posts/bulk/ and `manage.py ingest_posts`.
+
+A batch is validated in one pass (two lookup queries for all category and
+tag ids), slugs are allocated in bulk (blog/utils/slugs.py), tags
+are resolved/created set-wise (Tag.objects.resolve_names), posts and post-tag rows go in with
+bulk_create. bulk_create bypasses model signals, so counters are updated
+here and the derived data (search vectors, snapshots, related index, API
+cache, sitemap) is queued in the outbox once for the whole batch.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from rest_framework import serializers
+
+from .models import Category, OutboxEvent, Post, Tag
+from .outbox import emit, emit_cache, emit_posts
+from .utils.slugs import bulk_create_with_unique_slugs
+
+PostTag = Post.tags.through
+# Item keys that are not plain Post columns
+RELATION_KEYS = ("category", "tags", "tag_names", "canonical_url")
+
+
+def max_batch_size():
+    return getattr(settings, "BULK_POST_MAX_BATCH", 500)
+
+
+class BulkPostItemSerializer(serializers.ModelSerializer):
+    # Plain ids: existence is checked once per batch in BulkPostSerializer.validate()
+    category = serializers.IntegerField(required=False, allow_null=True)
+    tags = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+    tag_names = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False, default=list
+    )
+
+    class Meta:
+        model = Post
+        fields = [
+            'title', 'content', 'category', 'seo_title', 'seo_description', 'seo_keywords',
+            'is_indexable', 'is_draft', 'canonical_url', 'tags', 'tag_names',
+        ]
+
+
+class BulkPostSerializer(serializers.Serializer):
+    posts = BulkPostItemSerializer(many=True, allow_empty=False)
+
+    def validate_posts(self, items):
+        limit = max_batch_size()
+        if len(items) > limit:
+            raise serializers.ValidationError(f"At most {limit} posts per request.")
+
+        category_ids = {item["category"] for item in items if item.get("category")}
+        tag_ids = {tag_id for item in items for tag_id in item["tags"]}
+        known_categories = set(Category.objects.filter(pk__in=category_ids).values_list("pk", flat=True))
+        known_tags = set(Tag.objects.filter(pk__in=tag_ids).values_list("pk", flat=True))
+
+        errors = {}
+        for index, item in enumerate(items):
+            item_errors = {}
+            if item.get("category") and item["category"] not in known_categories:
+                item_errors["category"] = [f"Invalid pk \"{item['category']}\" - object does not exist."]
+            missing = [tag_id for tag_id in item["tags"] if tag_id not in known_tags]
+            if missing:
+                item_errors["tags"] = [f"Invalid pk(s) {missing} - object does not exist."]
+            if item_errors:
+                errors[index] = item_errors
+        if errors:
+            raise serializers.ValidationError(errors)
+        return items
+
+
+def ingest_posts(items, author=None):
+    """Create validated BulkPostItemSerializer items. Returns the new posts, in input order."""
+    site_url = getattr(settings, "SITE_URL", "https://zuuu.uz").rstrip("/")
+
+    with transaction.atomic():
+        tags = Tag.objects.resolve_names(
+            (name for item in items for name in item["tag_names"]), created_by=author
+        )
+        tags_by_name = {tag.name.lower(): tag for tag in tags}
+        posts = [
+            Post(
+                **{key: value for key, value in item.items() if key not in RELATION_KEYS},
+                category_id=item.get("category"),
+                author=author,
+                canonical_url=item.get("canonical_url") or None,
+            )
+            for item in items
+        ]
+        explicit_canonical = {id(post) for post in posts if post.canonical_url}
+        # bulk_create() skips Post.save(), so derive the content artifacts here.
+        for post in posts:
+            post.refresh_content_artifacts()
+
+        def derive_canonical(post):
+            # Re-run when slugs are re-allocated, so only touch derived URLs.
+            if id(post) not in explicit_canonical:
+                post.canonical_url = f"{site_url}/posts/{post.slug}"
+
+        bulk_create_with_unique_slugs(
+            Post, posts, [item["title"] for item in items], prepare=derive_canonical, batch_size=200
+        )
+
+        links = set()
+        for post, item in zip(posts, items):
+            links.update((post.pk, tag_id) for tag_id in item["tags"])
+            links.update(
+                (post.pk, tags_by_name[name.strip().lower()].pk)
+                for name in item["tag_names"] if name.strip()
+            )
+        PostTag.objects.bulk_create(
+            [PostTag(post_id=post_id, tag_id=tag_id) for post_id, tag_id in links], batch_size=1000
+        )
+
+        published = Counter(post.category_id for post in posts if post.category_id and not post.is_draft)
+        for category_id, count in published.items():
+            Category.objects.filter(pk=category_id).update(post_count=F("post_count") + count)
+
+        queue_ingest_refresh([post.pk for post in posts])
+    return posts
+
+
+def queue_ingest_refresh(post_ids):
+    """Outbox events for everything the per-row signals would have queued, once for the batch."""
+    emit_posts(post_ids, OutboxEvent.SEARCH, OutboxEvent.SNAPSHOT, OutboxEvent.RELATED_NEW)
+    emit_cache("posts", "categories", "tags", "archive")
+    emit(OutboxEvent.SITEMAP)
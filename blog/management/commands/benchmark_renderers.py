@@ -0,0 +1,50 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from blog import renderers
+from blog.serializers import PostListSerializer, PostSerializer
+from blog.snapshots import snapshot_queryset
+
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), len(result)
+
+
+class Command(BaseCommand):
+    help = 'Compare encode time and payload size of the stock JSON, orjson and MessagePack renderers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=50, help='Posts serialized into the payload')
+        parser.add_argument('--repeat', type=int, default=50, help='Runs per renderer (median is reported)')
+
+    def handle(self, *args, **options):
+        posts = list(snapshot_queryset()[:options['posts']])
+        if not posts:
+            raise CommandError('No posts to serialize.')
+
+        payloads = {
+            'detail': PostSerializer(posts[0], context={}).data,
+            'detail x%d' % len(posts): PostSerializer(posts, many=True, context={}).data,
+            'list page x%d' % len(posts): PostListSerializer(posts, many=True, context={}).data,
+        }
+        candidates = [('json (stock)', JSONRenderer())]
+        if renderers.orjson is not None:
+            candidates.append(('orjson', renderers.ORJSONRenderer()))
+        if renderers.msgpack is not None:
+            candidates.append(('msgpack', renderers.MessagePackRenderer()))
+
+        repeat = options['repeat']
+        self.stdout.write(f'{repeat} runs per renderer, median encode time')
+        self.stdout.write(f'{"payload":<18} {"renderer":<14} {"ms":>9} {"bytes":>10}')
+        for label, data in payloads.items():
+            for name, renderer in candidates:
+                ms, size = _timed(lambda: renderer.render(data, renderer.media_type, {}), repeat)
+                self.stdout.write(f'{label:<18} {name:<14} {ms:>9.3f} {size:>10}')
@@ -0,0 +1,54 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from blog.models import Post
+from blog.search import is_supported, search_posts
+
+DEFAULT_QUERIES = ['ielts writing', 'coherence', 'band 8 essay', 'desmos', 'opinion essay structure']
+
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text search (search_vector + GIN) with the legacy ILIKE SearchFilter path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', help='Search terms (default: a few IELTS/SAT phrases)')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query (median is reported)')
+        parser.add_argument('--limit', type=int, default=10, help='Rows fetched per run, like one API page')
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError('Full-text search benchmark requires PostgreSQL.')
+
+        queries = options['queries'] or DEFAULT_QUERIES
+        repeat = options['repeat']
+        limit = options['limit']
+        base = Post.objects.only('id', 'slug')
+
+        self.stdout.write(f'{Post.objects.count()} posts, {repeat} runs per query, page of {limit}')
+        self.stdout.write(f'{"query":<28} {"ilike ms":>10} {"fts ms":>10} {"ilike hits":>11} {"fts hits":>9}')
+        for terms in queries:
+            # Mirrors rest_framework.filters.SearchFilter: every word must match title or content.
+            legacy_filter = Q()
+            for word in terms.split():
+                legacy_filter &= Q(title__icontains=word) | Q(content__icontains=word)
+            legacy = base.filter(legacy_filter)
+            fulltext = search_posts(base, terms)
+
+            legacy_ms = _timed(lambda: list(legacy[:limit]), repeat)
+            fulltext_ms = _timed(lambda: list(fulltext[:limit]), repeat)
+            self.stdout.write(
+                f'{terms[:28]:<28} {legacy_ms:>10.2f} {fulltext_ms:>10.2f} '
+                f'{legacy.count():>11} {fulltext.count():>9}'
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.utils.routes import build_manifest, frontend_app_dir, manifest_path
+
+
+class Command(BaseCommand):
+    help = 'Write the frontend static route manifest used by the sitemap (skipped while blog-frontend/app is unchanged)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild even if the frontend tree mtime is unchanged')
+
+    def handle(self, *args, **options):
+        manifest, rebuilt = build_manifest(force=options['force'])
+        if manifest is None:
+            self.stderr.write(self.style.WARNING(f'No frontend app at {frontend_app_dir()} and no manifest at {manifest_path()}'))
+            return
+        routes = len(manifest['routes'])
+        if rebuilt:
+            self.stdout.write(self.style.SUCCESS(f'Route manifest written to {manifest_path()} ({routes} routes)'))
+        else:
+            self.stdout.write(f'Route manifest is up to date ({routes} routes)')
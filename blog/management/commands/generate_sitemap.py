@@ -9,9 +9,10 @@ class Command(BaseCommand):
         parser.add_argument('--domain', default='https://zuuu.uz', help='Site domain, e.g. https://example.com')
         # Default output is MEDIA_ROOT/sitemap.xml when not provided.
         parser.add_argument('--output', default=None, help='Output path for sitemap.xml (default: MEDIA_ROOT/sitemap.xml)')
+        parser.add_argument('--refresh-routes', action='store_true', help='Re-check blog-frontend/app and rebuild the route manifest if it changed')
 
     def handle(self, *args, **options):
         domain = options['domain']
         output = options['output']
-        path = generate_sitemap(domain=domain, output=output)
+        path = generate_sitemap(domain=domain, output=output, refresh_routes=options['refresh_routes'])
         self.stdout.write(self.style.SUCCESS(f'Sitemap written to {path}'))
@@ -0,0 +1,45 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.ingest import BulkPostSerializer, ingest_posts, max_batch_size
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create posts from a JSON file (a list of posts, or {"posts": [...]}); same format as /api/posts/bulk/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON file, or "-" for stdin')
+        parser.add_argument('--author', help='Username set as author (and creator of new tags)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Posts per transaction (default: BULK_POST_MAX_BATCH)')
+
+    def handle(self, *args, **options):
+        try:
+            if options['path'] == '-':
+                data = json.load(sys.stdin)
+            else:
+                with open(options['path'], encoding='utf-8') as fh:
+                    data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read posts: {exc}')
+        items = data.get('posts', []) if isinstance(data, dict) else data
+
+        author = None
+        if options['author']:
+            try:
+                author = get_user_model().objects.get(username=options['author'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'Unknown user "{options["author"]}"')
+
+        batch_size = min(options['batch_size'] or max_batch_size(), max_batch_size())
+        created = 0
+        for start in range(0, len(items), batch_size):
+            serializer = BulkPostSerializer(data={'posts': items[start:start + batch_size]})
+            if not serializer.is_valid():
+                raise CommandError(f'Posts {start}..{start + batch_size - 1} are invalid: {serializer.errors}')
+            created += len(ingest_posts(serializer.validated_data['posts'], author=author))
+            self.stdout.write(f'{created}/{len(items)} posts created')
+
+        self.stdout.write(self.style.SUCCESS(f'Ingested {created} posts'))
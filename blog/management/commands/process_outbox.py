@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.models import OutboxEvent
+from blog.outbox import batch_size, drain_all
+
+
+class Command(BaseCommand):
+    help = 'Apply pending outbox events (search vectors, snapshots, related posts, API cache, sitemap)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Events per batch (default: OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting once the outbox is empty')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls with --loop (default: 2)')
+
+    def handle(self, *args, **options):
+        limit = options['batch_size'] or batch_size()
+        while True:
+            handled, failed = drain_all(limit)
+            if handled or failed:
+                pending = OutboxEvent.objects.count()
+                self.stdout.write(f'Applied {handled} event(s), {failed} failed, {pending} pending')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Outbox drained'))
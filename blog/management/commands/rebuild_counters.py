@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Category, Comment, Post
+
+
+def _count_subquery(queryset, fk_field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{fk_field: OuterRef("pk")})
+            .order_by()
+            .values(fk_field)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def rebuild_counters():
+    """Recompute Category.post_count (published posts) and Post.comment_count with one UPDATE each."""
+    with transaction.atomic():
+        categories = Category.objects.update(post_count=_count_subquery(Post.objects.published(), "category"))
+        posts = Post.objects.update(comment_count=_count_subquery(Comment.objects.all(), "post"))
+    return categories, posts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized counters (Category.post_count, Post.comment_count)'
+
+    def handle(self, *args, **options):
+        categories, posts = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f'Counters rebuilt for {categories} categories and {posts} posts'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuild pre-serialized Post.snapshot for all posts (run after serializer/schema changes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Posts per bulk_update (default: 100)')
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_snapshots(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Snapshots rebuilt for {rebuilt} posts'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.related import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related-posts index (tag co-occurrence, IDF-weighted) for all posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Posts per transaction (default: 500)')
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Related posts rebuilt for {rebuilt} posts'))
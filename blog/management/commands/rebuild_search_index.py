@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.search import is_supported, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Backfill Post.search_vector (title, SEO fields, tags, plain-text content)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Posts per transaction (default: 200)')
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError('Full-text search index requires PostgreSQL.')
+        updated = update_search_vectors(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Search vectors rebuilt for {updated} posts'))
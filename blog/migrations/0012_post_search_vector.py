@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:48
+
+import html
+import re
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import Value
+
+# Frozen copy of blog.search.html_to_text as of this migration: later edits to the
+# live module must not change what this migration writes.
+TAG_RE = re.compile(r"<[^>]+>")
+SPACE_RE = re.compile(r"\s+")
+
+
+def html_to_text(value):
+    text = TAG_RE.sub(" ", value or "")
+    return SPACE_RE.sub(" ", html.unescape(text)).strip()
+
+
+def populate_search_vectors(apps, schema_editor):
+    # Without this `?search=` (POST_SEARCH_BACKEND='fulltext') matches nothing until
+    # `manage.py rebuild_search_index` runs. Weights as blog.search._post_vector had them
+    # here: A title, B SEO fields + tag names, C article body.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Post = apps.get_model("blog", "Post")
+    config = getattr(settings, "POST_SEARCH_CONFIG", "english")
+    posts = Post.objects.order_by("pk").only("pk", "content").prefetch_related("tags")
+    for post in posts.iterator(chunk_size=200):
+        tag_names = " ".join(tag.name for tag in post.tags.all())
+        Post.objects.filter(pk=post.pk).update(
+            search_vector=SearchVector("title", weight="A", config=config)
+            + SearchVector("seo_title", "seo_description", "seo_keywords", weight="B", config=config)
+            + SearchVector(Value(tag_names), weight="B", config=config)
+            + SearchVector(Value(html_to_text(post.content)), weight="C", config=config)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_comment_count_category_post_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='blog_post_search_gin'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_content_artifacts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('search', 'Search vector'), ('snapshot', 'Post snapshot'), ('related', 'Related posts (tags changed)'), ('related-new', 'Related posts (new posts)'), ('related-refill', 'Related posts (list lost an entry)'), ('cache', 'API cache namespace'), ('sitemap', 'Sitemap')], max_length=20)),
+                ('key', models.CharField(blank=True, max_length=100)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
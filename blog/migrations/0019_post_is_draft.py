@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_outbox_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_draft',
+            field=models.BooleanField(default=False, help_text='Draft posts are hidden from the public site and sitemap'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_is_draft'),
+    ]
+
+    operations = [
+        # State-only catch-up: Category.slug has been blank=True in models.py without a migration.
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(blank=True, unique=True),
+        ),
+    ]
@@ -1,13 +1,22 @@
 # /media/gradientvvv/Linux/blog-app/blog/models.py
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models import DEFERRED
+from django.db.models.functions import Lower, Upper
 from django.utils.text import slugify
 from django.utils.timezone import now
 from django.conf import settings
 
+from .content import ARTIFACT_FIELDS, analyze_html
+from .utils.slugs import SAVE_ATTEMPTS, allocate_slugs, save_with_unique_slug
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True, blank=True)
+    # Denormalized: maintained by blog.signals, rebuilt by `manage.py rebuild_counters`
+    post_count = models.PositiveIntegerField(default=0, editable=False)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -15,10 +24,57 @@ class Category(models.Model):
         super().save(*args, **kwargs)
 
     class Meta:
+        indexes = [
+            # /api/suggest/ typeahead (pg_trgm)
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='blog_category_name_trgm'),
+        ]
         verbose_name = 'Kategoriya'
         verbose_name_plural = 'Kategoriyalar'
 
 
+class TagManager(models.Manager):
+    def resolve_names(self, names, created_by=None):
+        """
+        Tags for `names` (case-insensitive, first spelling wins), in input
+        order without duplicates. Existing tags are found with one
+        LOWER(name) IN (...) query (blog_tag_name_lower_idx); the missing
+        ones are created with a single bulk INSERT.
+        """
+        wanted = {}
+        for name in names:
+            name = (name or "").strip()[:100]
+            if name:
+                wanted.setdefault(name.lower(), name)
+        if not wanted:
+            return []
+
+        def existing():
+            return {
+                tag.name.lower(): tag
+                for tag in self.alias(name_lower=Lower("name")).filter(name_lower__in=wanted.keys())
+            }
+
+        for attempt in range(SAVE_ATTEMPTS):
+            tags = existing()
+            missing = [name for key, name in wanted.items() if key not in tags]
+            if not missing:
+                break
+            try:
+                with transaction.atomic():
+                    self.bulk_create([
+                        self.model(name=name, slug=slug, created_by=created_by)
+                        for name, slug in zip(missing, allocate_slugs(self.model, missing))
+                    ])
+            except IntegrityError:
+                # Parallel yozuv shu nom yoki slugni yaratdi: qayta o'qib, qayta urinamiz
+                if attempt + 1 == SAVE_ATTEMPTS:
+                    raise
+                continue
+            tags = existing()
+            break
+        return [tags[key] for key in wanted if key in tags]
+
+
 class Tag(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(unique=True, blank=True)
@@ -32,24 +88,31 @@ class Tag(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-            base_slug = self.slug
-            counter = 1
-            while Tag.objects.exclude(pk=self.pk).filter(slug=self.slug).exists():
-                self.slug = f"{base_slug}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
+        # Bo'sh slug: bitta so'rov bilan bo'sh suffiks, parallel yozuvda qayta urinish
+        save_with_unique_slug(self, self.name, lambda: super(Tag, self).save(*args, **kwargs))
+
+    objects = TagManager()
 
     def __str__(self):
         return self.name
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="blog_tag_name_trgm"),
+            # Case-insensitive lookups (TagManager.resolve_names)
+            models.Index(Lower("name"), name="blog_tag_name_lower_idx"),
+        ]
         verbose_name = "Tag"
         verbose_name_plural = "Tags"
 
 
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        """Posts visible on the public site (drafts excluded)."""
+        return self.filter(is_draft=False)
+
+
 class Post(models.Model):
     category = models.ForeignKey(
         Category,
@@ -99,6 +162,12 @@ class Post(models.Model):
         help_text="Allow Google indexing"
     )
 
+    # Qoralama: faqat admin/staff ko'radi (masalan, AI batch generatsiya natijalari)
+    is_draft = models.BooleanField(
+        default=False,
+        help_text="Draft posts are hidden from the public site and sitemap"
+    )
+
     canonical_url = models.URLField(
         blank=True,
         null=True
@@ -109,29 +178,76 @@ class Post(models.Model):
         related_name="posts",
     )
 
+    # Denormalized: maintained by blog.signals, rebuilt by `manage.py rebuild_counters`
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Full-text search: title (A), SEO + tags (B), plain-text body (C). See blog/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Derived from content on save (one HTML parse), so lists never load content. See blog/content.py
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_minutes = models.PositiveSmallIntegerField(default=0, editable=False)
+    excerpt = models.CharField(max_length=300, blank=True, editable=False)
+    toc = models.JSONField(default=list, blank=True, editable=False)
+
+    # Pre-serialized PostSerializer output served by the detail endpoint. See blog/snapshots.py
+    snapshot = models.JSONField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(default=now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PostQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded category/draft state so re-categorizing or publishing can move the counter.
+        instance._loaded_category_id = instance.__dict__.get('category_id', DEFERRED)
+        instance._loaded_is_draft = instance.__dict__.get('is_draft', DEFERRED)
+        instance._loaded_slug = instance.__dict__.get('slug', DEFERRED)
+        return instance
+
+    def refresh_content_artifacts(self):
+        """Recompute word count, reading time, excerpt and TOC; anchors H2/H3 in content."""
+        artifacts = analyze_html(self.content)
+        self.content = artifacts.html
+        self.word_count = artifacts.word_count
+        self.reading_minutes = artifacts.reading_minutes
+        self.excerpt = artifacts.excerpt
+        self.toc = artifacts.toc
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Post.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-
-        if not self.canonical_url and self.slug:
-            site_url = getattr(settings, "SITE_URL", "https://zuuu.uz").rstrip("/")
-            self.canonical_url = f"{site_url}/posts/{self.slug}"
-        super().save(*args, **kwargs)
+        # Deferred content (e.g. .only() loads) means nothing to re-derive.
+        if 'content' in self.__dict__:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or 'content' in update_fields:
+                self.refresh_content_artifacts()
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | set(ARTIFACT_FIELDS)
+        derive_canonical = not self.canonical_url
+
+        def write():
+            # Slug may be re-allocated on a concurrent clash, so canonical follows it.
+            if derive_canonical and self.slug:
+                site_url = getattr(settings, "SITE_URL", "https://zuuu.uz").rstrip("/")
+                self.canonical_url = f"{site_url}/posts/{self.slug}"
+            # Counter updates in post_save receivers commit or roll back with the row.
+            with transaction.atomic():
+                super(Post, self).save(*args, **kwargs)
+
+        save_with_unique_slug(self, self.title, write)
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset (cursor) pagination: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['-created_at', '-id'], name='blog_post_created_id_idx'),
+            GinIndex(fields=['search_vector'], name='blog_post_search_gin'),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='blog_post_title_trgm'),
+        ]
         verbose_name = 'Maqola'
         verbose_name_plural = 'Maqolalar'
 
@@ -151,14 +267,91 @@ class Comment(models.Model):
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_post_id = instance.__dict__.get('post_id', DEFERRED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.author} - {self.post.title[:30]}"
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='blog_comment_created_id_idx'),
+            # /api/posts/{slug}/comments/ cursor pagination
+            models.Index(fields=['post', '-created_at', '-id'], name='blog_comment_post_created_idx'),
+        ]
         verbose_name = 'Izoh'
         verbose_name_plural = 'Izohlar'
 
 
+class RelatedPost(models.Model):
+    """Precomputed top-K related posts (shared tags, IDF-weighted). See blog/related.py"""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_entries'
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_from'
+    )
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='blog_relatedpost_unique_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['post', 'rank'], name='blog_relatedpost_rank_idx'),
+        ]
+        verbose_name = 'Related post'
+        verbose_name_plural = 'Related posts'
+
+
+class OutboxEvent(models.Model):
+    """
+    Pending derived-data work, written in the same transaction as the change
+    that caused it and consumed in batches by blog/outbox.py.
+    """
+    SEARCH = 'search'
+    SNAPSHOT = 'snapshot'
+    RELATED = 'related'
+    RELATED_NEW = 'related-new'
+    RELATED_REFILL = 'related-refill'
+    CACHE = 'cache'
+    SITEMAP = 'sitemap'
+    KIND_CHOICES = [
+        (SEARCH, 'Search vector'),
+        (SNAPSHOT, 'Post snapshot'),
+        (RELATED, 'Related posts (tags changed)'),
+        (RELATED_NEW, 'Related posts (new posts)'),
+        (RELATED_REFILL, 'Related posts (list lost an entry)'),
+        (CACHE, 'API cache namespace'),
+        (SITEMAP, 'Sitemap'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Post id for the post-level kinds, namespace for CACHE, empty for SITEMAP
+    key = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind}:{self.key}"
+
+    class Meta:
+        ordering = ['id']
+
+
 class AdSenseSettings(models.Model):
     """Singleton model to store AdSense configuration"""
     publisher_id = models.CharField(
@@ -0,0 +1,152 @@
+"""
+Transactional outbox for post-derived data.
+
+Receivers in blog/signals.py (and bulk ingest) don't touch derived data
+themselves: they insert OutboxEvent rows in the same transaction as the
+change, so the work commits or rolls back with it and survives a crash.
+After commit a drain is queued (blog.tasks.drain_outbox, debounced like
+the sitemap); `manage.py process_outbox --loop` is the worker-less
+alternative.
+
+A drain locks a batch (SELECT ... FOR UPDATE SKIP LOCKED, so consumers can
+run side by side), collapses it to one set of keys per kind and calls each
+builder once. Cache bumps and the sitemap refresh run only after the
+batch's rebuilt data has committed, so a fresh cache entry never
+captures a stale snapshot. A failing kind stays queued, is retried by a
+later drain and is dropped after OUTBOX_MAX_ATTEMPTS.
+"""
+import logging
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .cache import bump
+from .models import OutboxEvent
+from .related import rebuild_related, update_related_for_new_posts, update_related_for_posts
+from .search import update_search_vectors
+from .snapshots import rebuild_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+def batch_size():
+    return getattr(settings, "OUTBOX_BATCH_SIZE", 1000)
+
+
+def max_attempts():
+    return getattr(settings, "OUTBOX_MAX_ATTEMPTS", 5)
+
+
+def _post_ids(keys):
+    return [int(key) for key in keys]
+
+
+def _refresh_sitemap(keys):
+    from .tasks import schedule_sitemap_refresh
+
+    schedule_sitemap_refresh()
+
+
+# Dispatch order: data first, then what is derived from it, caches last.
+HANDLERS = {
+    OutboxEvent.SEARCH: lambda keys: update_search_vectors(_post_ids(keys)),
+    OutboxEvent.RELATED_NEW: lambda keys: update_related_for_new_posts(_post_ids(keys)),
+    OutboxEvent.RELATED: lambda keys: update_related_for_posts(_post_ids(keys)),
+    OutboxEvent.RELATED_REFILL: lambda keys: rebuild_related(_post_ids(keys)),
+    OutboxEvent.SNAPSHOT: lambda keys: rebuild_snapshots(_post_ids(keys)),
+    OutboxEvent.CACHE: lambda keys: bump(*sorted(keys)),
+    OutboxEvent.SITEMAP: _refresh_sitemap,
+}
+# Not transactional: run once the drain has committed what they expose.
+AFTER_COMMIT = {OutboxEvent.CACHE, OutboxEvent.SITEMAP}
+
+
+def emit(kind, keys=("",)):
+    """Queue `kind` work for each key (post ids, cache namespaces) in the current transaction."""
+    events = [OutboxEvent(kind=kind, key=str(key)) for key in dict.fromkeys(keys) if key is not None]
+    if not events:
+        return
+    OutboxEvent.objects.bulk_create(events)
+    transaction.on_commit(_schedule_drain)
+
+
+def emit_posts(post_ids, *kinds):
+    post_ids = list(post_ids)
+    for kind in kinds:
+        emit(kind, post_ids)
+
+
+def emit_cache(*namespaces):
+    emit(OutboxEvent.CACHE, namespaces)
+
+
+def _schedule_drain():
+    from .tasks import schedule_outbox_drain
+
+    schedule_outbox_drain()
+
+
+def drain(limit=None):
+    """
+    Process one batch of pending events. Returns (handled, failed) event
+    counts; (0, 0) when the outbox is empty or every row is locked.
+    """
+    with transaction.atomic():
+        rows = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .order_by("pk")
+            .values_list("pk", "kind", "key")[:limit or batch_size()]
+        )
+        if not rows:
+            return 0, 0
+
+        keys, ids = defaultdict(set), defaultdict(list)
+        for pk, kind, key in rows:
+            keys[kind].add(key)
+            ids[kind].append(pk)
+
+        done, failed = [], []
+        for kind, handler in HANDLERS.items():
+            if kind not in keys:
+                continue
+            if kind in AFTER_COMMIT:
+                transaction.on_commit(partial(handler, keys[kind]))
+                done.extend(ids[kind])
+                continue
+            try:
+                with transaction.atomic():
+                    handler(keys[kind])
+                done.extend(ids[kind])
+            except Exception:
+                logger.exception("Outbox handler %r failed for %d key(s)", kind, len(keys[kind]))
+                failed.extend(ids[kind])
+
+        unknown = set(keys) - set(HANDLERS)
+        for kind in unknown:
+            logger.error("Dropping %d outbox event(s) of unknown kind %r", len(ids[kind]), kind)
+            done.extend(ids[kind])
+
+        OutboxEvent.objects.filter(pk__in=done).delete()
+        if failed:
+            OutboxEvent.objects.filter(pk__in=failed).update(attempts=F("attempts") + 1)
+            dead = OutboxEvent.objects.filter(pk__in=failed, attempts__gte=max_attempts())
+            dropped = dead.delete()[0]
+            if dropped:
+                logger.error("Dropped %d outbox event(s) after %d attempts", dropped, max_attempts())
+    return len(done), len(failed)
+
+
+def drain_all(limit=None):
+    """
+    Drain until empty. Returns (handled, failed); stops at the first batch
+    with failures so failing events aren't retried in a tight loop.
+    """
+    total = 0
+    while True:
+        handled, failed = drain(limit)
+        total += handled
+        if failed or not handled:
+            return total, failed
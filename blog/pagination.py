@@ -0,0 +1,60 @@
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+from rest_framework.settings import api_settings
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination over (-created_at, -id); no OFFSET scans and no COUNT(*)."""
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+class PageOrCursorPagination(BasePagination):
+    """
+    Page-number pagination by default (old clients keep `count`/`page`),
+    keyset pagination when the client sends `?cursor=` or `?pagination=cursor`.
+    `?search=` always pages by number: results are ordered by SearchRank,
+    which a (-created_at, -id) cursor would throw away.
+    """
+    mode_query_param = "pagination"
+    page_number_class = PageNumberPagination
+    cursor_class = CreatedAtCursorPagination
+
+    def __init__(self):
+        self.page_number = self.page_number_class()
+        self.cursor = self.cursor_class()
+        self.active = self.page_number
+
+    def _select(self, request):
+        params = request.query_params
+        if params.get(api_settings.SEARCH_PARAM, "").strip():
+            return self.page_number
+        if self.cursor.cursor_query_param in params or params.get(self.mode_query_param) == "cursor":
+            return self.cursor
+        return self.page_number
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.active = self._select(request)
+        return self.active.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.active.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.active.to_html()
+
+    def get_results(self, data):
+        return data["results"]
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number.get_schema_operation_parameters(view)
+            + self.cursor.get_schema_operation_parameters(view)
+        )
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.active, "display_page_controls", False)
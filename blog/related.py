@@ -0,0 +1,157 @@
+"""
+Related-posts index: for each post, the top-K posts sharing its tags,
+scored by the sum of IDF weights of the shared tags, so a tag on every
+post ("IELTS") counts for little and a rare tag counts for a lot. Only
+published posts are candidates (and counted for IDF); drafts still get
+a list of their own for previewing.
+
+Maintained incrementally through the outbox (blog/outbox.py) when a
+post's tags change; `manage.py rebuild_related_posts` recomputes
+everything (and refreshes IDF weights, which drift slightly between full
+rebuilds).
+"""
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, FloatField, Min, Sum, Value, When
+
+from .models import Post, RelatedPost
+
+PostTag = Post.tags.through
+
+
+def related_limit():
+    return getattr(settings, "RELATED_POSTS_LIMIT", 6)
+
+
+def _tag_ids(post_id):
+    return list(PostTag.objects.filter(post_id=post_id).values_list("tag_id", flat=True))
+
+
+def _total_posts():
+    return Post.objects.published().count()
+
+
+def _idf(tag_ids, total_posts):
+    doc_freq = dict(
+        PostTag.objects.filter(tag_id__in=tag_ids, post__is_draft=False)
+        .values("tag_id")
+        .annotate(df=Count("post_id"))
+        .values_list("tag_id", "df")
+    )
+    return {tag_id: math.log(1 + total_posts / doc_freq[tag_id]) for tag_id in doc_freq}
+
+
+def candidate_scores(post_id, limit=None, tag_ids=None, total_posts=None, idf=None):
+    """[(candidate_post_id, score)] best first, computed in one GROUP BY query."""
+    tag_ids = _tag_ids(post_id) if tag_ids is None else tag_ids
+    if not tag_ids:
+        return []
+    if idf is None:
+        total_posts = _total_posts() if total_posts is None else total_posts
+        idf = _idf(tag_ids, total_posts)
+    weight = Case(
+        *[When(tag_id=tag_id, then=Value(idf[tag_id])) for tag_id in tag_ids if tag_id in idf],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    queryset = (
+        PostTag.objects.filter(tag_id__in=tag_ids, post__is_draft=False)
+        .exclude(post_id=post_id)
+        .values("post_id")
+        .annotate(score=Sum(weight))
+        .order_by("-score", "-post_id")
+        .values_list("post_id", "score")
+    )
+    return list(queryset[:limit] if limit else queryset)
+
+
+def rebuild_related(post_ids, total_posts=None):
+    """Recompute the stored top-K list of each given post."""
+    post_ids = [pk for pk in set(post_ids) if pk is not None]
+    if not post_ids:
+        return 0
+    limit = related_limit()
+    total_posts = _total_posts() if total_posts is None else total_posts
+    existing = set(Post.objects.filter(pk__in=post_ids).values_list("pk", flat=True))
+    # Tags of every post and their IDF weights up front: one scoring query per post
+    tags_by_post = defaultdict(list)
+    for post_id, tag_id in PostTag.objects.filter(post_id__in=existing).values_list("post_id", "tag_id"):
+        tags_by_post[post_id].append(tag_id)
+    idf = _idf({tag_id for tag_ids in tags_by_post.values() for tag_id in tag_ids}, total_posts)
+
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=post_ids).delete()
+        rows = []
+        for post_id in existing:
+            scores = candidate_scores(post_id, limit=limit, tag_ids=tags_by_post[post_id], idf=idf)
+            for rank, (related_id, score) in enumerate(scores, start=1):
+                rows.append(RelatedPost(post_id=post_id, related_id=related_id, score=score, rank=rank))
+        RelatedPost.objects.bulk_create(rows, batch_size=500)
+    return len(existing)
+
+
+def _affected_by(post_id, limit):
+    """Lists to rebuild after `post_id`'s tags changed (see update_related_for_post)."""
+    scores = dict(candidate_scores(post_id))
+    affected = {post_id}
+    affected.update(RelatedPost.objects.filter(related_id=post_id).values_list("post_id", flat=True))
+
+    if scores:
+        weakest = {
+            row["post_id"]: (row["weakest"], row["entries"])
+            for row in RelatedPost.objects.filter(post_id__in=scores.keys())
+            .values("post_id")
+            .annotate(weakest=Min("score"), entries=Count("id"))
+        }
+        for candidate_id, score in scores.items():
+            weakest_score, entries = weakest.get(candidate_id, (0.0, 0))
+            if entries < limit or score > weakest_score:
+                affected.add(candidate_id)
+    return affected
+
+
+def update_related_for_post(post_id):
+    """
+    Incremental update after `post_id`'s tags changed: rebuild its own
+    list, every list that currently contains it, and every list it now
+    qualifies for (score beats that list's weakest entry, or the list
+    is not full). Scores are symmetric, so one candidate query suffices.
+    """
+    return rebuild_related(_affected_by(post_id, related_limit()))
+
+
+def update_related_for_posts(post_ids):
+    """Same as update_related_for_post for many posts, rebuilding each affected list once."""
+    limit = related_limit()
+    affected = set()
+    for post_id in set(post_ids):
+        affected |= _affected_by(post_id, limit)
+    return rebuild_related(affected)
+
+
+def update_related_for_new_posts(post_ids):
+    """
+    After inserting many posts at once: a new post can only enter the
+    lists of posts sharing one of its tags, so rebuild those and the new
+    posts' own lists in one pass.
+    """
+    post_ids = set(post_ids)
+    new_tags = PostTag.objects.filter(post_id__in=post_ids).values("tag_id")
+    affected = post_ids | set(PostTag.objects.filter(tag_id__in=new_tags).values_list("post_id", flat=True))
+    return rebuild_related(affected)
+
+
+def rebuild_all(batch_size=500):
+    total_posts = _total_posts()
+    rebuilt = 0
+    last_pk = 0
+    while True:
+        ids = list(Post.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            break
+        rebuilt += rebuild_related(ids, total_posts=total_posts)
+        last_pk = ids[-1]
+    return rebuilt
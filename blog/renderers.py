@@ -0,0 +1,77 @@
+"""
+Faster JSON (orjson) renderer/parser and an opt-in MessagePack renderer.
+
+Both libraries are optional: without orjson the classes behave exactly
+like DRF's JSONRenderer/JSONParser. The MessagePack renderer is only
+chosen for an explicit Accept: application/msgpack, and settings register
+it only when msgpack is installed, so without it those requests get 406.
+"""
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+# Same fallback DRF uses for Decimal, lazy strings, UUIDs, querysets, ...
+_default = JSONEncoder().default
+
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in JSONRenderer that encodes with orjson (compact, UTF-8)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        # Datetimes go through DRF's encoder too: it writes UTC as "Z", orjson as "+00:00"
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context):
+            option |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_default, option=option)
+        # Keep the output a strict JavaScript subset, like JSONRenderer.
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b"\\u2028").replace(PARAGRAPH_SEPARATOR, b"\\u2029")
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """application/msgpack, selected only when the client sends that Accept header."""
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed; application/msgpack is unavailable.")
+        return msgpack.packb(data, default=_default, use_bin_type=True)
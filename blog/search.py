@@ -0,0 +1,147 @@
+import html
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Prefetch, Q, Value
+from django.db.models.functions import Upper
+from rest_framework import filters
+
+from .models import Category, Post, Tag
+
+TAG_RE = re.compile(r"<[^>]+>")
+SPACE_RE = re.compile(r"\s+")
+
+
+def search_config():
+    """Postgres text search configuration (e.g. 'english', 'russian', 'simple')."""
+    return getattr(settings, "POST_SEARCH_CONFIG", "english")
+
+
+def is_supported():
+    return connection.vendor == "postgresql"
+
+
+def html_to_text(value):
+    text = TAG_RE.sub(" ", value or "")
+    return SPACE_RE.sub(" ", html.unescape(text)).strip()
+
+
+def _post_vector(post, config):
+    # A: title, B: SEO fields + tag names, C: article body
+    tag_names = " ".join(tag.name for tag in post.tags.all())
+    return (
+        SearchVector("title", weight="A", config=config)
+        + SearchVector("seo_title", "seo_description", "seo_keywords", weight="B", config=config)
+        + SearchVector(Value(tag_names), weight="B", config=config)
+        + SearchVector(Value(html_to_text(post.content)), weight="C", config=config)
+    )
+
+
+def update_search_vectors(post_ids=None, batch_size=200):
+    """
+    Recompute Post.search_vector for the given posts (all posts when None).
+    Returns the number of posts updated. No-op outside PostgreSQL.
+    """
+    if not is_supported():
+        return 0
+
+    config = search_config()
+    queryset = (
+        Post.objects.order_by("pk")
+        .only("pk", "content")
+        .prefetch_related(Prefetch("tags", queryset=Tag.objects.only("pk", "name")))
+    )
+    if post_ids is not None:
+        queryset = queryset.filter(pk__in=list(post_ids))
+
+    updated = 0
+    batch = []
+    for post in queryset.iterator(chunk_size=batch_size):
+        batch.append(post)
+        if len(batch) >= batch_size:
+            updated += _write_vectors(batch, config)
+            batch = []
+    if batch:
+        updated += _write_vectors(batch, config)
+    return updated
+
+
+def _write_vectors(posts, config):
+    with transaction.atomic():
+        for post in posts:
+            Post.objects.filter(pk=post.pk).update(search_vector=_post_vector(post, config))
+    return len(posts)
+
+
+def search_posts(queryset, terms):
+    """Filter by the maintained search vector and order by weighted rank."""
+    query = SearchQuery(terms, search_type="websearch", config=search_config())
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F("search_vector"), query))
+        .order_by("-search_rank", "-created_at", "-id")
+    )
+
+
+class PostFullTextSearchFilter(filters.SearchFilter):
+    """
+    `?search=` backed by Post.search_vector (GIN index) on PostgreSQL.
+    Falls back to the stock ILIKE SearchFilter elsewhere or when
+    POST_SEARCH_BACKEND = "legacy".
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+        if not is_supported() or getattr(settings, "POST_SEARCH_BACKEND", "fulltext") == "legacy":
+            return super().filter_queryset(request, queryset, view)
+        return search_posts(queryset, terms)
+
+
+# (type, model, label field) for /api/suggest/
+SUGGEST_SOURCES = (
+    ("post", Post, "title"),
+    ("tag", Tag, "name"),
+    ("category", Category, "name"),
+)
+
+
+def suggest(terms, limit=8):
+    """
+    Compact ranked typeahead over post titles, tag names and category names.
+    Both predicates run on UPPER(field) so they hit the gin_trgm_ops
+    expression indexes; plain prefix matching outside PostgreSQL.
+    """
+    terms = SPACE_RE.sub(" ", terms).strip()
+    if not terms:
+        return []
+
+    results = []
+    for kind, model, field in SUGGEST_SOURCES:
+        queryset = model.objects.published() if model is Post else model.objects.all()
+        if is_supported():
+            queryset = (
+                queryset.alias(label_upper=Upper(field))
+                .filter(Q(label_upper__contains=terms.upper()) | Q(label_upper__trigram_word_similar=terms))
+                .annotate(score=TrigramWordSimilarity(terms, Upper(field)))
+                .order_by("-score", field)
+            )
+        else:
+            queryset = (
+                queryset.filter(**{f"{field}__istartswith": terms})
+                .annotate(score=Value(1.0, output_field=FloatField()))
+                .order_by(field)
+            )
+        for label, slug, score in queryset.values_list(field, "slug", "score")[:limit]:
+            results.append({"type": kind, "label": label, "slug": slug, "score": round(score, 3)})
+
+    results.sort(key=lambda item: (-item["score"], len(item["label"])))
+    return results[:limit]
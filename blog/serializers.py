@@ -1,9 +1,48 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import connection
+from .fieldsets import SparseFieldsetSerializerMixin
 from .models import Category, Post, Comment, AdSenseSettings, Tag
 from django.core.validators import MinLengthValidator, FileExtensionValidator
 from django.core.files.images import get_image_dimensions
 
+class _QueryRecorder:
+    """connection.execute_wrapper() hook that records the SQL of every query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+class QueryGuardListSerializer(serializers.ListSerializer):
+    """
+    List serializer that fails loudly when a child serializer hits the
+    database for each row. Rows are loaded (with their prefetches) before
+    serialization starts, so any query issued afterwards is an N+1.
+    Enabled when SERIALIZER_QUERY_GUARD is true (defaults to DEBUG).
+    """
+
+    def to_representation(self, data):
+        if not getattr(settings, "SERIALIZER_QUERY_GUARD", settings.DEBUG):
+            return super().to_representation(data)
+
+        rows = list(data.all() if hasattr(data, "all") else data)
+        recorder = _QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            representation = super().to_representation(rows)
+        if rows and recorder.queries:
+            raise AssertionError(
+                f"{type(self.child).__name__} issued {len(recorder.queries)} queries while serializing "
+                f"{len(rows)} prefetched rows. Use select_related/prefetch_related/annotate "
+                f"in the view queryset. First query: {recorder.queries[0]}"
+            )
+        return representation
+
+
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[MinLengthValidator(8)])
 
@@ -15,63 +54,138 @@ class UserSerializer(serializers.ModelSerializer):
         # Parolni hash qilib saqlash (Production uchun shart!)
         return User.objects.create_user(**validated_data)
 
-class CategorySerializer(serializers.ModelSerializer):
-    post_count = serializers.IntegerField(source='posts.count', read_only=True)
-
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'post_count']
+        read_only_fields = ['post_count']
+        list_serializer_class = QueryGuardListSerializer
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     created_by = serializers.ReadOnlyField(source="created_by.username")
 
     class Meta:
         model = Tag
         fields = ["id", "name", "slug", "created_by", "created_at"]
         read_only_fields = ["slug", "created_by", "created_at"]
+        list_serializer_class = QueryGuardListSerializer
+
+
+class TagSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ["id", "name", "slug"]
+        list_serializer_class = QueryGuardListSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
 
     class Meta:
         model = Comment
         fields = ['id', 'author', 'text', 'created_at', 'post']
+        list_serializer_class = QueryGuardListSerializer
+
+class PostRepresentationMixin:
+    """Read-only helpers shared by the full and the list representation of a post."""
+    # ORM lookups read by the method fields (used to trim ?fields= querysets)
+    method_field_sources = {
+        'featured_image_url': ('featured_image',),
+        'tag_names': ('tags',),
+    }
+
+    def get_featured_image_url(self, obj):
+        if obj.featured_image:
+            request = self.context.get('request')
+            return request.build_absolute_uri(obj.featured_image.url) if request else obj.featured_image.url
+        return None
+
+    def get_tag_names(self, obj):
+        # obj.tags.all() reuses prefetch_related('tags'); values_list() would query per row.
+        return [tag.name for tag in obj.tags.all()]
+
+
+class TagNamesField(serializers.ListField):
+    """Tag names of a post; on write resolved (or created) via Tag.objects.resolve_names."""
+    child = serializers.CharField(max_length=100)
+
+    def get_attribute(self, instance):
+        # Reuses prefetch_related('tags')
+        return [tag.name for tag in instance.tags.all()]
 
-class PostSerializer(serializers.ModelSerializer):
+
+class PostSerializer(PostRepresentationMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
     category_name = serializers.ReadOnlyField(source='category.name')
     category_slug = serializers.ReadOnlyField(source='category.slug')
-    comments = CommentSerializer(many=True, read_only=True)
+    # Faqat oxirgi N ta izoh; qolganlari /api/posts/{slug}/comments/ orqali (cursor pagination)
+    comments = serializers.SerializerMethodField()
     featured_image_url = serializers.SerializerMethodField()
     tags = serializers.PrimaryKeyRelatedField(
         queryset=Tag.objects.all(),
         many=True,
         required=False,
     )
-    tag_details = TagSerializer(source="tags", many=True, read_only=True)
-    tag_names = serializers.SerializerMethodField()
+    # Embedded tags: no created_by, so they need nothing beyond prefetch_related('tags')
+    tag_details = TagSummarySerializer(source="tags", many=True, read_only=True)
+    # Yozish mumkin: ["IELTS", "Writing"] -> mavjud taglar topiladi, yo'qlari yaratiladi
+    tag_names = TagNamesField(required=False)
+
+    method_field_sources = {
+        **PostRepresentationMixin.method_field_sources,
+        'comments': ('comments',),
+    }
 
     class Meta:
         model = Post
         fields = [
             'id', 'title', 'content', 'author', 'category', 'category_name',
             'category_slug',
-            'created_at', 'updated_at', 'slug', 'comments', 'featured_image',
+            'created_at', 'updated_at', 'slug', 'comments', 'comment_count', 'featured_image',
             'featured_image_url', 'seo_title', 'seo_description', 'seo_keywords',
-            'is_indexable', 'canonical_url', 'tags', 'tag_details', 'tag_names'
+            'is_indexable', 'is_draft', 'canonical_url', 'tags', 'tag_details', 'tag_names',
+            'word_count', 'reading_minutes', 'excerpt', 'toc'
         ]
-        read_only_fields = ['slug', 'featured_image_url']
-
-    def get_featured_image_url(self, obj):
-        if obj.featured_image:
-            request = self.context.get('request')
-            return request.build_absolute_uri(obj.featured_image.url) if request else obj.featured_image.url
-        return None
+        read_only_fields = [
+            'slug', 'featured_image_url', 'comment_count',
+            'word_count', 'reading_minutes', 'excerpt', 'toc',
+        ]
+        list_serializer_class = QueryGuardListSerializer
 
-    def get_tag_names(self, obj):
-        return list(obj.tags.values_list("name", flat=True))
+    def create(self, validated_data):
+        tag_names = validated_data.pop('tag_names', None)
+        replace = 'tags' not in validated_data  # super() pops m2m fields
+        instance = super().create(validated_data)
+        self._apply_tag_names(instance, tag_names, replace)
+        return instance
+
+    def update(self, instance, validated_data):
+        tag_names = validated_data.pop('tag_names', None)
+        replace = 'tags' not in validated_data  # super() pops m2m fields
+        instance = super().update(instance, validated_data)
+        self._apply_tag_names(instance, tag_names, replace)
+        return instance
+
+    def _apply_tag_names(self, instance, tag_names, replace):
+        """tag_names alone replace the post's tags; together with `tags` they are added to them."""
+        if tag_names is None:
+            return
+        request = self.context.get('request')
+        user = request.user if request and request.user.is_authenticated else None
+        tags = Tag.objects.resolve_names(tag_names, created_by=user)
+        if replace:
+            instance.tags.set(tags)
+        elif tags:
+            instance.tags.add(*tags)
+
+    def get_comments(self, obj):
+        # PostViewSet.retrieve prefetches the first N comments into recent_comments.
+        comments = getattr(obj, 'recent_comments', None)
+        if comments is None:
+            limit = getattr(settings, 'POST_DETAIL_COMMENT_LIMIT', 10)
+            comments = obj.comments.select_related('author').order_by('-created_at', '-id')[:limit]
+        return CommentSerializer(comments, many=True, context=self.context).data
 
     def validate_featured_image(self, value):
         if value:
@@ -86,6 +200,27 @@ class PostSerializer(serializers.ModelSerializer):
         return value
 
 
+class PostListSerializer(PostRepresentationMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Compact card representation used by list endpoints (no HTML content, no comments)."""
+    author = serializers.ReadOnlyField(source='author.username')
+    category_name = serializers.ReadOnlyField(source='category.name')
+    category_slug = serializers.ReadOnlyField(source='category.slug')
+    featured_image_url = serializers.SerializerMethodField()
+    tag_details = TagSummarySerializer(source="tags", many=True, read_only=True)
+    tag_names = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = [
+            'id', 'title', 'slug', 'excerpt', 'word_count', 'reading_minutes',
+            'author', 'category', 'category_name', 'category_slug', 'created_at',
+            'updated_at', 'featured_image_url', 'tags', 'tag_details', 'tag_names',
+            'comment_count'
+        ]
+        read_only_fields = fields
+        list_serializer_class = QueryGuardListSerializer
+
+
 class AdSenseSettingsSerializer(serializers.ModelSerializer):
     """Serialize AdSense settings for frontend consumption"""
     
@@ -99,3 +234,4 @@ class AdSenseSettingsSerializer(serializers.ModelSerializer):
             'post_content_ad_unit_id'
         ]
         read_only_fields = fields  # Frontend should only read, not modify
+
@@ -1,30 +1,264 @@
-from pathlib import Path
-from django.conf import settings
-from django.db.models.signals import post_save, post_delete
+from django.db.models import DEFERRED, F
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Post
-import threading
-from .utils.sitemap import generate_sitemap
+from .models import Category, Comment, OutboxEvent, Post, RelatedPost, Tag
+from .outbox import emit, emit_cache, emit_posts
 
-
-def _generate(domain=None):
-    try:
-        sitemap_domain = domain or getattr(settings, "SITE_URL", "https://zuuu.uz")
-        output = str(Path(settings.MEDIA_ROOT) / "sitemap.xml")
-        generate_sitemap(domain=sitemap_domain, output=output)
-    except Exception:
-        pass
+# Counters are updated in place (same transaction). Everything derived
+# (search vectors, snapshots, related index, API cache, sitemap) is queued
+# as OutboxEvents in the same transaction and applied by blog/outbox.py.
 
 
 @receiver(post_save, sender=Post)
 def post_saved_update_sitemap(sender, instance, created, **kwargs):
-    # Run in background so write operations are not blocked.
-    t = threading.Thread(target=_generate, kwargs={"domain": None}, daemon=True)
-    t.start()
+    # Debounced: a burst of saves (bulk edit, import) yields one rebuild.
+    emit(OutboxEvent.SITEMAP)
 
 
 @receiver(post_delete, sender=Post)
 def post_deleted_update_sitemap(sender, instance, **kwargs):
     # Keep sitemap fresh after deletions as well.
-    t = threading.Thread(target=_generate, kwargs={"domain": None}, daemon=True)
-    t.start()
+    emit(OutboxEvent.SITEMAP)
+
+
+def _bump_counter(model, pk, field, delta):
+    if pk is None:
+        return
+    model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _counted_category_id(category_id, is_draft):
+    # Category.post_count counts published posts only.
+    return None if is_draft else category_id
+
+
+@receiver(post_save, sender=Post)
+def post_saved_update_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = _counted_category_id(instance.category_id, instance.is_draft)
+    loaded_category_id = getattr(instance, "_loaded_category_id", DEFERRED)
+    loaded_is_draft = getattr(instance, "_loaded_is_draft", DEFERRED)
+    if created:
+        _bump_counter(Category, current, "post_count", 1)
+    elif loaded_category_id is not DEFERRED and loaded_is_draft is not DEFERRED:
+        previous = _counted_category_id(loaded_category_id, loaded_is_draft)
+        if previous != current:
+            _bump_counter(Category, previous, "post_count", -1)
+            _bump_counter(Category, current, "post_count", 1)
+    instance._loaded_category_id = instance.category_id
+    instance._loaded_is_draft = instance.is_draft
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted_update_counters(sender, instance, **kwargs):
+    _bump_counter(Category, _counted_category_id(instance.category_id, instance.is_draft), "post_count", -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved_update_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_loaded_post_id", DEFERRED)
+    current = instance.post_id
+    if created:
+        _bump_counter(Post, current, "comment_count", 1)
+    elif previous is not DEFERRED and previous != current:
+        _bump_counter(Post, previous, "comment_count", -1)
+        _bump_counter(Post, current, "comment_count", 1)
+    instance._loaded_post_id = current
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted_update_counters(sender, instance, **kwargs):
+    _bump_counter(Post, instance.post_id, "comment_count", -1)
+
+
+
+SEARCH_SOURCE_FIELDS = {"title", "content", "seo_title", "seo_description", "seo_keywords"}
+
+
+@receiver(post_save, sender=Post)
+def post_saved_update_search_vector(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields and not SEARCH_SOURCE_FIELDS & set(update_fields)):
+        return
+    emit_posts([instance.pk], OutboxEvent.SEARCH)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed_update_search_vector(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # tag.posts.clear(): remember the posts before the rows are gone
+        instance._cleared_post_ids = list(instance.posts.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        emit_posts([instance.pk], OutboxEvent.SEARCH)
+    elif action == "post_clear":
+        emit_posts(getattr(instance, "_cleared_post_ids", []), OutboxEvent.SEARCH)
+    else:
+        emit_posts(pk_set, OutboxEvent.SEARCH)
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved_update_search_vector(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    emit_posts(instance.posts.values_list("pk", flat=True), OutboxEvent.SEARCH)
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleting_remember_posts(sender, instance, **kwargs):
+    instance._tagged_post_ids = list(instance.posts.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted_update_search_vector(sender, instance, **kwargs):
+    emit_posts(getattr(instance, "_tagged_post_ids", []), OutboxEvent.SEARCH)
+
+
+# --- API response cache invalidation (blog/cache.py) ---
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed_invalidate_cache(sender, instance, **kwargs):
+    # archive: create/delete change the counts; edits may change a stub (title, slug, month)
+    namespaces = {"posts", "categories", "archive", f"post:{instance.slug}"}
+    loaded_slug = getattr(instance, "_loaded_slug", DEFERRED)
+    if loaded_slug is not DEFERRED and loaded_slug != instance.slug:
+        namespaces.add(f"post:{loaded_slug}")
+    instance._loaded_slug = instance.slug
+    emit_cache(*namespaces)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed_invalidate_cache(sender, instance, action, reverse, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        emit_cache("posts", "tags", "archive", "post-relations")
+    else:
+        emit_cache("posts", "tags", "archive", f"post:{instance.slug}")
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed_invalidate_cache(sender, instance, **kwargs):
+    slug = Post.objects.filter(pk=instance.post_id).values_list("slug", flat=True).first()
+    namespaces = {"posts"}
+    if slug:
+        namespaces.add(f"post:{slug}")
+    emit_cache(*namespaces)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed_invalidate_cache(sender, instance, **kwargs):
+    emit_cache("tags", "posts", "post-relations")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed_invalidate_cache(sender, instance, **kwargs):
+    emit_cache("categories", "posts", "post-relations")
+
+
+# --- Post.snapshot rebuilds (blog/snapshots.py) ---
+
+@receiver(post_save, sender=Post)
+def post_saved_rebuild_snapshot(sender, instance, raw=False, **kwargs):
+    if not raw:
+        emit_posts([instance.pk], OutboxEvent.SNAPSHOT)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed_rebuild_snapshot(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        emit_posts([instance.pk], OutboxEvent.SNAPSHOT)
+    elif action == "post_clear":
+        emit_posts(getattr(instance, "_cleared_post_ids", []), OutboxEvent.SNAPSHOT)
+    else:
+        emit_posts(pk_set, OutboxEvent.SNAPSHOT)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed_rebuild_snapshot(sender, instance, raw=False, **kwargs):
+    if not raw:
+        emit_posts([instance.post_id], OutboxEvent.SNAPSHOT)
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved_rebuild_snapshots(sender, instance, created, raw=False, **kwargs):
+    if not (raw or created):
+        emit_posts(instance.posts.values_list("pk", flat=True), OutboxEvent.SNAPSHOT)
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted_rebuild_snapshots(sender, instance, **kwargs):
+    emit_posts(getattr(instance, "_tagged_post_ids", []), OutboxEvent.SNAPSHOT)
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting_remember_posts(sender, instance, **kwargs):
+    instance._category_post_ids = list(instance.posts.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Category)
+def category_saved_rebuild_snapshots(sender, instance, created, raw=False, **kwargs):
+    if not (raw or created):
+        emit_posts(instance.posts.values_list("pk", flat=True), OutboxEvent.SNAPSHOT)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted_rebuild_snapshots(sender, instance, **kwargs):
+    emit_posts(getattr(instance, "_category_post_ids", []), OutboxEvent.SNAPSHOT)
+
+
+# --- Related-posts index (blog/related.py) ---
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed_update_related(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        emit_posts([instance.pk], OutboxEvent.RELATED)
+    elif action == "post_clear":
+        emit_posts(getattr(instance, "_cleared_post_ids", []), OutboxEvent.RELATED)
+    else:
+        emit_posts(pk_set, OutboxEvent.RELATED)
+
+
+@receiver(pre_save, sender=Post)
+def post_saving_remember_publication(sender, instance, raw=False, **kwargs):
+    # Read before post_saved_update_counters resets _loaded_is_draft
+    loaded = getattr(instance, "_loaded_is_draft", DEFERRED)
+    instance._publication_changed = not raw and loaded is not DEFERRED and loaded != instance.is_draft
+
+
+@receiver(post_save, sender=Post)
+def post_publication_changed_update_related(sender, instance, **kwargs):
+    # Publishing enters other posts' lists; unpublishing drops out of them
+    if getattr(instance, "_publication_changed", False):
+        emit_posts([instance.pk], OutboxEvent.RELATED)
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted_update_related(sender, instance, **kwargs):
+    emit_posts(getattr(instance, "_tagged_post_ids", []), OutboxEvent.RELATED)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting_remember_related_lists(sender, instance, **kwargs):
+    instance._listed_by_post_ids = list(
+        RelatedPost.objects.filter(related_id=instance.pk).values_list("post_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted_refill_related_lists(sender, instance, **kwargs):
+    emit_posts(getattr(instance, "_listed_by_post_ids", []), OutboxEvent.RELATED_REFILL)
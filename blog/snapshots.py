@@ -0,0 +1,98 @@
+"""
+Pre-serialized public representation of each post (Post.snapshot).
+
+The snapshot is the PostSerializer output built without a request, so
+media URLs are stored relative and made absolute at serve time. It is
+rebuilt through the outbox (blog/outbox.py) on post, tag, category and
+comment changes; `manage.py rebuild_post_snapshots` rebuilds everything
+after a schema or serializer change.
+"""
+from django.conf import settings
+from django.db.models import Prefetch
+from rest_framework.response import Response
+
+from .models import Comment, Post
+
+ABSOLUTE_URL_FIELDS = ("featured_image", "featured_image_url")
+
+
+def snapshot_queryset():
+    limit = getattr(settings, "POST_DETAIL_COMMENT_LIMIT", 10)
+    recent = Comment.objects.select_related("author").order_by("-created_at", "-id")[:limit]
+    return (
+        Post.objects.select_related("author", "category")
+        .prefetch_related("tags", Prefetch("comments", queryset=recent, to_attr="recent_comments"))
+        .defer("search_vector", "snapshot")
+        .order_by("pk")
+    )
+
+
+def build_snapshot(post):
+    from .serializers import PostSerializer
+
+    return dict(PostSerializer(post, context={}).data)
+
+
+def rebuild_snapshots(post_ids=None, batch_size=100):
+    """Rebuild Post.snapshot for the given posts (all when None). Returns the count."""
+    queryset = snapshot_queryset()
+    if post_ids is not None:
+        post_ids = list(post_ids)
+        if not post_ids:
+            return 0
+        queryset = queryset.filter(pk__in=post_ids)
+
+    rebuilt = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        for post in batch:
+            post.snapshot = build_snapshot(post)
+        Post.objects.bulk_update(batch, ["snapshot"])
+        rebuilt += len(batch)
+        last_pk = batch[-1].pk
+    return rebuilt
+
+
+def with_absolute_urls(snapshot, request):
+    data = dict(snapshot)
+    for field in ABSOLUTE_URL_FIELDS:
+        url = data.get(field)
+        if url and url.startswith("/"):
+            data[field] = request.build_absolute_uri(url)
+    return data
+
+
+def snapshot_fields(queryset, fields):
+    """Only the given top-level keys of the snapshot, extracted in SQL (None when missing)."""
+    row = (
+        queryset.filter(snapshot__isnull=False)
+        .values_list(*[f"snapshot__{name}" for name in fields])
+        .first()
+    )
+    return dict(zip(fields, row)) if row is not None else None
+
+
+class SnapshotRetrieveMixin:
+    """
+    Serve retrieve straight from Post.snapshot; fall back to the serializer
+    when missing. With a sparse fieldset (blog/fieldsets.py) only the
+    requested keys are read from the database.
+    """
+
+    def get_snapshot_queryset(self):
+        return Post.objects.all()
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        queryset = self.get_snapshot_queryset().filter(**{self.lookup_field: lookup})
+        fieldset = self.get_fieldset() if hasattr(self, "get_fieldset") else None
+        if fieldset is None:
+            snapshot = queryset.values_list("snapshot", flat=True).first()
+        else:
+            snapshot = snapshot_fields(queryset, fieldset)
+        if snapshot is None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(with_absolute_urls(snapshot, request))
@@ -1,16 +1,148 @@
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 import logging
+import uuid
 
-from .ai_services import generate_post_with_ai, AIGenerationError
+from .ai_batch import generate_drafts, summarize
+from .ai_services import generate_post_with_ai, generation_key, AIGenerationError
 from .models import Post
+from .utils.sitemap import generate_sitemap
 from django.contrib.auth.models import User
 
 logger = logging.getLogger(__name__)
 
+# Sitemap regeneration: writes only mark it dirty; one delayed task per burst rebuilds it.
+SITEMAP_DIRTY_KEY = "sitemap:dirty"
+SITEMAP_LOCK_KEY = "sitemap:lock"
+
+
+def _sitemap_delay():
+    return getattr(settings, "SITEMAP_REFRESH_DELAY", 30)
+
+
+def _sitemap_lock_timeout():
+    return getattr(settings, "SITEMAP_LOCK_TIMEOUT", 10 * 60)
+
+
+def schedule_sitemap_refresh():
+    """
+    Mark the sitemap dirty. Only the first call of a burst queues
+    regenerate_sitemap (after SITEMAP_REFRESH_DELAY seconds); later ones
+    find the dirty flag already set and are no-ops.
+    """
+    # Expires on its own if the queued task is lost, so a later write re-schedules.
+    if not cache.add(SITEMAP_DIRTY_KEY, 1, timeout=_sitemap_delay() + _sitemap_lock_timeout()):
+        return
+    try:
+        regenerate_sitemap.apply_async(countdown=_sitemap_delay())
+    except Exception:
+        cache.delete(SITEMAP_DIRTY_KEY)
+        logger.exception("Could not queue sitemap regeneration")
+
+
+@shared_task(ignore_result=True)
+def regenerate_sitemap():
+    """Rebuild MEDIA_ROOT/sitemap.xml (+ shards); at most one rebuild runs at a time."""
+    # Writes from here on belong to the next run.
+    cache.delete(SITEMAP_DIRTY_KEY)
+    token = uuid.uuid4().hex
+    if not cache.add(SITEMAP_LOCK_KEY, token, timeout=_sitemap_lock_timeout()):
+        # Another worker is mid-rebuild and may have missed our writes: try again later.
+        schedule_sitemap_refresh()
+        return None
+    try:
+        return generate_sitemap(domain=getattr(settings, "SITE_URL", "https://zuuu.uz"))
+    finally:
+        if cache.get(SITEMAP_LOCK_KEY) == token:
+            cache.delete(SITEMAP_LOCK_KEY)
+
+
+# Outbox (blog/outbox.py): every commit that wrote events asks for a drain; one is queued per burst.
+OUTBOX_SCHEDULED_KEY = "outbox:scheduled"
+
+
+def schedule_outbox_drain(delay=None):
+    delay = getattr(settings, "OUTBOX_DRAIN_DELAY", 1) if delay is None else delay
+    if not cache.add(OUTBOX_SCHEDULED_KEY, 1, timeout=delay + 60):
+        return
+    try:
+        drain_outbox.apply_async(countdown=delay)
+    except Exception:
+        cache.delete(OUTBOX_SCHEDULED_KEY)
+        # The events are safe in the table; the next drain (or process_outbox) picks them up.
+        logger.exception("Could not queue outbox drain")
+
+
+@shared_task(ignore_result=True)
+def drain_outbox():
+    """Apply pending OutboxEvents in batches; re-queues itself later if some failed."""
+    from .outbox import drain_all
+
+    # Events committed from here on get their own drain.
+    cache.delete(OUTBOX_SCHEDULED_KEY)
+    handled, failed = drain_all()
+    if failed:
+        schedule_outbox_drain(delay=getattr(settings, "OUTBOX_RETRY_DELAY", 60))
+    return handled
+
+
+# AI generation: identical requests (ai_services.generation_key) in flight share one task id.
+GENERATION_TASK_KEY = "aigen:task:{}"
+
+
+def _generation_task_ttl():
+    return getattr(settings, "AI_GENERATION_TASK_TTL", 10 * 60)
+
+
+def start_generation_task(topic, keywords=None, tone=None, category_id=None, author_id=None, refresh=False):
+    """
+    Queue generate_post_async, or return the id of the task already queued
+    for an identical request. `refresh` always starts a new task. Returns
+    (task_id, shared?).
+    """
+    key = GENERATION_TASK_KEY.format(generation_key(topic, keywords, tone))
+    task_id = uuid.uuid4().hex
+    if refresh:
+        cache.set(key, task_id, timeout=_generation_task_ttl())
+    elif not cache.add(key, task_id, timeout=_generation_task_ttl()):
+        existing = cache.get(key)
+        if existing:
+            return existing, True
+        cache.set(key, task_id, timeout=_generation_task_ttl())
+    try:
+        generate_post_async.apply_async(
+            kwargs={
+                'topic': topic,
+                'keywords': keywords,
+                'tone': tone,
+                'category_id': category_id,
+                'author_id': author_id,
+                'refresh': refresh,
+            },
+            task_id=task_id,
+        )
+    except Exception:
+        _release_generation_task(topic, keywords, tone, task_id)
+        raise
+    return task_id, False
+
+
+def running_generation_task(topic, keywords=None, tone=None):
+    """Id of the generate_post_async task queued for an identical request, if any."""
+    return cache.get(GENERATION_TASK_KEY.format(generation_key(topic, keywords, tone)))
+
+
+def _release_generation_task(topic, keywords, tone, task_id):
+    """Forget a failed task so the next identical request starts a fresh one."""
+    key = GENERATION_TASK_KEY.format(generation_key(topic, keywords, tone))
+    if cache.get(key) == task_id:
+        cache.delete(key)
+
 
 @shared_task(bind=True, max_retries=2, default_retry_delay=10)
-def generate_post_async(self, topic, keywords=None, tone=None, category_id=None, author_id=None):
+def generate_post_async(self, topic, keywords=None, tone=None, category_id=None, author_id=None, refresh=False):
     """
     Asynchronously generate a blog post content using AI.
     
@@ -20,6 +152,7 @@ def generate_post_async(self, topic, keywords=None, tone=None, category_id=None,
         tone: Writing tone (default: 'expert')
         category_id: Optional category ID
         author_id: User ID of the post creator
+        refresh: Skip the generation cache (identical calls still share one OpenAI request)
         
     Returns:
         dict with generated content or error info
@@ -31,7 +164,8 @@ def generate_post_async(self, topic, keywords=None, tone=None, category_id=None,
         generated = generate_post_with_ai(
             topic=topic,
             keywords=keywords,
-            tone=tone or 'expert'
+            tone=tone or 'expert',
+            refresh=refresh,
         )
         
         logger.info(f"Successfully generated content for topic: {generated.title}")
@@ -49,6 +183,7 @@ def generate_post_async(self, topic, keywords=None, tone=None, category_id=None,
         
     except AIGenerationError as e:
         logger.error(f"AI generation error: {str(e)}")
+        _release_generation_task(topic, keywords, tone, self.request.id)
         return {
             'success': False,
             'error': str(e),
@@ -56,5 +191,39 @@ def generate_post_async(self, topic, keywords=None, tone=None, category_id=None,
         }
     except Exception as e:
         logger.exception(f"Unexpected error in generate_post_async: {str(e)}")
+        if self.request.retries >= self.max_retries:
+            _release_generation_task(topic, keywords, tone, self.request.id)
         # Retry on unexpected errors
         raise self.retry(exc=e)
+
+
+@shared_task(bind=True)
+def generate_posts_batch_async(self, topics, keywords=None, tone=None, category_id=None, author_id=None, refresh=False):
+    """
+    Generate a draft post for each topic (blog/ai_batch.py) with bounded
+    concurrency. While running the task is in state PROGRESS with
+    summarize() output as meta, so task-status shows per-topic progress.
+    """
+    author = User.objects.filter(pk=author_id).first() if author_id else None
+
+    def progress(items):
+        if self.request.id:
+            self.update_state(state='PROGRESS', meta=summarize(items))
+
+    logger.info(f"Starting AI batch generation for {len(topics)} topic(s)")
+    items = generate_drafts(
+        topics,
+        keywords=keywords,
+        tone=tone or 'expert',
+        category_id=category_id,
+        author=author,
+        refresh=refresh,
+        on_progress=progress,
+    )
+    summary = summarize(items)
+    logger.info(f"AI batch generation finished: {summary['saved']} saved, {summary['failed']} failed")
+    return {
+        'success': summary['saved'] > 0,
+        **summary,
+        'message': f"{summary['saved']} of {summary['total']} draft post(s) created.",
+    }
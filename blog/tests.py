@@ -1,5 +1,690 @@
 # blog/tests.py
 
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+import gzip
+import json
+from pathlib import Path
+import shutil
+import tempfile
+import time
+from unittest import mock, skipUnless
+import uuid
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import outbox, tasks
+from .ai_batch import RateLimiter, generate_drafts
+from .ai_services import AIGenerationInProgress, generate_post_with_ai, generation_key
+from .checks import check_shared_cache
+from .content import analyze_html, only_anchors_added
+from .ingest import ingest_posts
+from .management.commands.rebuild_counters import rebuild_counters
+from .models import Category, Comment, OutboxEvent, Post, RelatedPost, Tag
+from .outbox import drain
+from .related import rebuild_related
+from .renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+from .serializers import PostListSerializer
+from .snapshots import rebuild_snapshots
+from .tasks import GENERATION_TASK_KEY
+from .utils import slugs
+from .utils.sitemap import generate_sitemap
+from .views import PostViewSet
+
+
+class BlogTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        # No broker in tests: drains and sitemap refreshes are run explicitly.
+        for task in ("drain_outbox", "regenerate_sitemap"):
+            patcher = mock.patch(f"blog.tasks.{task}.apply_async")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user("author", password="secret-pass")
+        self.category = Category.objects.create(name="IELTS")
+        self.tags = [Tag.objects.create(name=name, created_by=self.user) for name in ("Writing", "Reading")]
+        self.client = APIClient()
+
+    def make_post(self, title="Sample post", **kwargs):
+        kwargs.setdefault("content", "<h2>Intro</h2><p>Some text here.</p>")
+        kwargs.setdefault("category", self.category)
+        kwargs.setdefault("author", self.user)
+        post = Post.objects.create(title=title, **kwargs)
+        post.tags.set(self.tags)
+        return post
+
+    def drain(self):
+        # Cache bumps and the sitemap refresh run on commit of the drain
+        with self.captureOnCommitCallbacks(execute=True):
+            drain()
+
+
+@override_settings(SERIALIZER_QUERY_GUARD=True)
+class QueryGuardTests(BlogTestCase):
+    def test_guard_fires_on_per_row_queries(self):
+        self.make_post("First")
+        self.make_post("Second")
+        # No select_related/prefetch_related: author, category and tags query per row
+        with self.assertRaisesRegex(AssertionError, "queries while serializing"):
+            PostListSerializer(Post.objects.all(), many=True).data
+
+    def test_post_endpoints_pass_the_guard(self):
+        post = self.make_post()
+        Post.objects.filter(pk=post.pk).update(snapshot=None)
+
+        self.assertEqual(self.client.get("/api/posts/").status_code, 200)
+        # No snapshot yet: the serializer fallback
+        response = self.client.get(f"/api/posts/{post.slug}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([tag["name"] for tag in response.data["tag_details"]], ["Reading", "Writing"])
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            "/api/posts/",
+            {"title": "Created", "content": "<p>Body</p>", "tag_names": ["Writing", "Listening"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        response = self.client.patch(
+            f"/api/posts/{response.data['slug']}/", {"tags": [tag.pk for tag in self.tags]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+
+        rebuild_snapshots([post.pk])
+        self.assertIsNotNone(Post.objects.get(pk=post.pk).snapshot)
+
+
+class ConditionalGetTests(BlogTestCase):
+    def test_list_last_modified_advances_on_delete(self):
+        self.make_post("First")
+        second = self.make_post("Second")
+        Post.objects.update(updated_at=now() - timedelta(hours=1))
+        self.drain()
+        response = self.client.get("/api/posts/")
+        last_modified = response["Last-Modified"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        # HTTP dates have one-second resolution: let the bump land in a later second
+        with mock.patch("blog.cache.time.time", return_value=time.time() + 5):
+            self.drain()
+        # max(updated_at) of the remaining posts did not move; the 'posts' bump did
+        response = self.client.get("/api/posts/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unchanged_list_is_not_modified(self):
+        self.make_post()
+        self.drain()
+        response = self.client.get("/api/posts/")
+        response = self.client.get(
+            "/api/posts/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"], HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(ALLOWED_HOSTS=["backend", "zuuu.uz"])
+class ResponseCacheTests(BlogTestCase):
+    def test_entries_are_not_shared_between_hosts(self):
+        self.make_post(featured_image="posts/cover.jpg")
+        internal = self.client.get("/api/posts/", HTTP_HOST="backend")
+        public = self.client.get("/api/posts/", HTTP_HOST="zuuu.uz")
+        self.assertEqual(public["X-Cache"], "MISS")
+        self.assertIn("http://zuuu.uz/", public.content.decode())
+        self.assertNotIn("http://backend/", public.content.decode())
+        self.assertEqual(self.client.get("/api/posts/", HTTP_HOST="backend")["X-Cache"], "HIT")
+        self.assertEqual(internal["X-Cache"], "MISS")
+
+
+class SearchTests(BlogTestCase):
+    def test_search_stays_ranked_when_cursor_paging_is_requested(self):
+        title_match = self.make_post("Grammar basics")
+        self.make_post("Other", content="<h2>Intro</h2><p>A note on grammar.</p>")
+        Post.objects.filter(pk=title_match.pk).update(created_at=now() - timedelta(days=1))
+        self.drain()
+        for query in ("?search=grammar", "?search=grammar&pagination=cursor"):
+            page = self.client.get(f"/api/posts/{query}").json()
+            self.assertEqual(page["count"], 2)
+            self.assertEqual(page["results"][0]["slug"], title_match.slug)
+
+
+class SuggestTests(BlogTestCase):
+    def test_short_queries_skip_the_lookup_and_limit_is_capped(self):
+        with mock.patch("blog.views.suggest", return_value=[]) as lookup:
+            self.assertEqual(self.client.get("/api/suggest/?q=i").json(), {"query": "i", "results": []})
+            lookup.assert_not_called()
+            self.client.get("/api/suggest/?q=ie&limit=500")
+            lookup.assert_called_once_with("ie", limit=10)
+            self.client.get("/api/suggest/?q=ie&limit=0")
+            lookup.assert_called_with("ie", limit=1)
+
+    def test_matches_published_titles_tags_and_categories(self):
+        self.make_post("Ielts writing tips")
+        self.make_post("Ielts draft", is_draft=True)
+        Tag.objects.create(name="Ielts", created_by=self.user)
+        # Plain prefix matching: the trigram path needs the pg_trgm extension
+        with mock.patch("blog.search.is_supported", return_value=False):
+            results = self.client.get("/api/suggest/?q=ielts").json()["results"]
+            capped = self.client.get("/api/suggest/?q=ielts&limit=2").json()["results"]
+        self.assertEqual(
+            [(item["type"], item["label"]) for item in results],
+            [("tag", "Ielts"), ("category", "IELTS"), ("post", "Ielts writing tips")],
+        )
+        self.assertEqual(capped, results[:2])
+
+
+class RendererTests(BlogTestCase):
+    def test_orjson_output_matches_json_renderer(self):
+        data = {
+            "text": "line\u2028break\u2029é",
+            "created_at": datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc),
+            "price": Decimal("1.50"),
+            "id": uuid.UUID(int=1),
+            7: [None, True, 1.5],
+        }
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        self.assertIn(b"\\u2028", rendered)
+
+    def test_msgpack_without_the_renderer_is_406(self):
+        with mock.patch.object(PostViewSet, "renderer_classes", [ORJSONRenderer]):
+            self.assertEqual(self.client.get("/api/posts/", HTTP_ACCEPT="application/msgpack").status_code, 406)
+
+    @skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_is_negotiated_only_on_request(self):
+        self.make_post()
+        with mock.patch.object(PostViewSet, "renderer_classes", [ORJSONRenderer, MessagePackRenderer]):
+            self.assertEqual(self.client.get("/api/posts/")["Content-Type"], "application/json")
+            response = self.client.get("/api/posts/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content)["count"], 1)
+
+
+class SparseFieldsetTests(BlogTestCase):
+    def test_unknown_field_is_400(self):
+        response = self.client.get("/api/posts/?fields=slug,nope")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("nope", response.json()["fields"])
+
+    def test_slug_and_updated_at_skip_the_tag_prefetch(self):
+        self.make_post()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/posts/?fields=slug,updated_at")
+        self.assertEqual(list(response.json()["results"][0]), ["slug", "updated_at"])
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn("blog_tag", sql)
+        self.assertNotIn('"blog_post"."content"', sql)
+
+    def test_snapshot_detail_returns_only_requested_keys(self):
+        post = self.make_post()
+        rebuild_snapshots([post.pk])
+        with mock.patch("blog.views.PostViewSet.get_serializer") as get_serializer:
+            response = self.client.get(f"/api/posts/{post.slug}/?fields=title,slug")
+        get_serializer.assert_not_called()  # served from the snapshot
+        self.assertEqual(response.json(), {"title": post.title, "slug": post.slug})
+
+
+class SnapshotTests(BlogTestCase):
+    def test_snapshot_matches_serializer_output(self):
+        post = self.make_post(featured_image="posts/cover.jpg")
+        Comment.objects.create(post=post, author=self.user, text="Nice")
+        url = f"/api/posts/{post.slug}/"
+
+        Post.objects.filter(pk=post.pk).update(snapshot=None)
+        from_serializer = self.client.get(url).json()
+        rebuild_snapshots([post.pk])
+        cache.clear()
+        from_snapshot = self.client.get(url).json()
+
+        self.assertTrue(from_serializer["featured_image"].startswith("http://testserver/"))
+        self.assertEqual(from_snapshot, from_serializer)
+
+
+class PostCommentsEndpointTests(BlogTestCase):
+    def test_comments_are_paged_and_read_only(self):
+        post = self.make_post()
+        for text in ("First", "Second"):
+            Comment.objects.create(post=post, author=self.user, text=text)
+        url = f"/api/posts/{post.slug}/comments/"
+        page = self.client.get(url).json()
+        self.assertEqual([comment["text"] for comment in page["results"]], ["Second", "First"])
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.post(url, {"text": "Hi"}).status_code, 405)
+
+
+class RelatedEndpointTests(BlogTestCase):
+    def test_unknown_slug_is_404(self):
+        self.assertEqual(self.client.get("/api/posts/no-such-post/related/").status_code, 404)
+
+    def test_lists_precomputed_related_posts(self):
+        post = self.make_post("First")
+        other = self.make_post("Second")
+        rebuild_related([post.pk, other.pk])
+        response = self.client.get(f"/api/posts/{post.slug}/related/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["slug"] for item in response.data], [other.slug])
+
+
+class SlugAllocationTests(BlogTestCase):
+    def test_picks_first_free_suffix_and_ignores_other_prefix_matches(self):
+        for title in ("Race", "Race", "Race condition", "Race 7"):
+            self.make_post(title)
+        # race, race-1 taken; race-condition / race-7 only share the prefix
+        self.assertEqual(
+            slugs.allocate_slugs(Post, ["Race", "Race", "Race condition"]),
+            ["race-2", "race-3", "race-condition-1"],
+        )
+
+    def test_long_titles_keep_suffix_within_max_length(self):
+        title = "x" * 200
+        first, second = self.make_post(title), self.make_post(title)
+        self.assertEqual(len(first.slug), 50)
+        self.assertEqual(second.slug, "x" * 48 + "-1")
+
+    def test_save_retries_when_a_concurrent_writer_takes_the_slug(self):
+        self.make_post("Race")
+        real = slugs.allocate_slug
+        stale = iter(["race"])  # what a writer that allocated before the other INSERT saw
+        with mock.patch.object(slugs, "allocate_slug", side_effect=lambda *a, **k: next(stale, None) or real(*a, **k)) as allocate:
+            post = self.make_post("Race")
+        self.assertEqual(post.slug, "race-1")
+        self.assertEqual(allocate.call_count, 2)
+
+    def test_other_integrity_errors_are_not_retried(self):
+        with mock.patch.object(slugs, "allocate_slug", wraps=slugs.allocate_slug) as allocate:
+            with self.assertRaises(IntegrityError):
+                Tag.objects.create(name="Writing")  # duplicate name, free slug
+        self.assertEqual(allocate.call_count, 1)
+
+    def test_bulk_create_reallocates_the_batch_on_clash(self):
+        self.make_post("Race")
+        real = slugs.allocate_slugs
+        calls = []
+
+        def allocate(model, values, **kwargs):
+            calls.append(values)
+            return ["race", "other"] if len(calls) == 1 else real(model, values, **kwargs)
+
+        posts = [Post(title=title, content="<p>x</p>") for title in ("Race", "Other")]
+        with mock.patch.object(slugs, "allocate_slugs", side_effect=allocate):
+            slugs.bulk_create_with_unique_slugs(Post, posts, ["Race", "Other"])
+        self.assertEqual([post.slug for post in posts], ["race-1", "other"])
+        self.assertEqual(len(calls), 2)
+
+    def test_resolve_names_retries_after_a_concurrent_insert(self):
+        real = slugs.allocate_slugs
+        # First attempt collides with the existing "writing" slug, as a parallel insert would
+        with mock.patch("blog.models.allocate_slugs", side_effect=[["writing"], real(Tag, ["Writing 2"])]):
+            tags = Tag.objects.resolve_names(["Writing", "Writing 2"])
+        self.assertEqual([tag.name for tag in tags], ["Writing", "Writing 2"])
+        self.assertEqual(tags[1].slug, "writing-2")
+
+
+class ResolveNamesTests(BlogTestCase):
+    def test_case_folding_input_order_and_deduplication(self):
+        with CaptureQueriesContext(connection) as queries:
+            tags = Tag.objects.resolve_names(
+                ["  reading ", "Grammar", "WRITING", "grammar", "", None, "Vocabulary"], created_by=self.user
+            )
+        self.assertEqual([tag.name for tag in tags], ["Reading", "Grammar", "Writing", "Vocabulary"])
+        self.assertEqual(tags[0], self.tags[1])  # existing tags are reused, not re-created
+        self.assertEqual(Tag.objects.count(), 4)
+        # Both missing names go in with one bulk INSERT
+        self.assertEqual(sum('INSERT INTO "blog_tag"' in query["sql"] for query in queries), 1)
+        self.assertEqual(Tag.objects.resolve_names(["", "  "]), [])
+
+
+class BulkIngestTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def bulk(self, items):
+        return self.client.post("/api/posts/bulk/", items, format="json")
+
+    @override_settings(BULK_POST_MAX_BATCH=2)
+    def test_oversized_batch_is_rejected(self):
+        response = self.bulk([{"title": f"Post {n}", "content": "<p>x</p>"} for n in range(3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("At most 2", str(response.json()["posts"]))
+        self.assertFalse(Post.objects.exists())
+
+    def test_item_errors_are_reported_by_index_and_nothing_is_created(self):
+        response = self.bulk([
+            {"title": "Fine", "content": "<p>x</p>", "category": self.category.pk},
+            {"title": "Broken", "content": "<p>x</p>", "category": 9999, "tags": [9999]},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["posts"]
+        self.assertEqual(list(errors), ["1"])
+        self.assertEqual(set(errors["1"]), {"category", "tags"})
+        self.assertFalse(Post.objects.exists())
+
+    def test_slugs_are_unique_within_the_batch_and_against_existing_posts(self):
+        self.make_post("Same title")
+        response = self.bulk([{"title": "Same title", "content": "<p>x</p>"} for _ in range(2)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([post["slug"] for post in response.json()["posts"]], ["same-title-1", "same-title-2"])
+
+    def test_tag_names_resolve_case_insensitively(self):
+        response = self.bulk([
+            {"title": "One", "content": "<p>x</p>", "tag_names": ["writing", "New Tag"]},
+            {"title": "Two", "content": "<p>x</p>", "tag_names": ["WRITING", "new tag"]},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Tag.objects.filter(name__iexact="new tag").count(), 1)
+        for post in Post.objects.all():
+            self.assertEqual(sorted(post.tags.values_list("name", flat=True)), ["New Tag", "Writing"])
+
+
+class ArchiveTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        march = [self.make_post(f"March {day}", created_at=datetime(2026, 3, day, 12, tzinfo=dt_timezone.utc))
+                 for day in (15, 16, 17)]
+        other = Category.objects.create(name="Other")
+        january = self.make_post("January", category=other, created_at=datetime(2026, 1, 10, 12, tzinfo=dt_timezone.utc))
+        january.tags.set(self.tags[:1])
+        march[0].tags.set(self.tags[1:])
+        self.make_post("Draft", is_draft=True, created_at=datetime(2026, 3, 20, 12, tzinfo=dt_timezone.utc))
+        self.march, self.other = march, other
+
+    def get(self, query=""):
+        response = self.client.get(f"/api/archive/{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_bucket_counts_newest_first(self):
+        data = self.get()
+        self.assertEqual(data["count"], 4)
+        self.assertEqual(
+            [(b["year"], b["month"], b["count"]) for b in data["buckets"]], [(2026, 3, 3), (2026, 1, 1)]
+        )
+        self.assertNotIn("posts", data["buckets"][0])
+
+    @override_settings(ARCHIVE_MAX_POSTS_PER_BUCKET=2)
+    def test_per_bucket_caps_and_clamps_post_stubs(self):
+        march = self.get("?posts=1&per_bucket=1")["buckets"][0]
+        self.assertEqual(march["count"], 3)
+        self.assertEqual([post["slug"] for post in march["posts"]], [self.march[2].slug])
+        # Above ARCHIVE_MAX_POSTS_PER_BUCKET (and by default): clamped to 2
+        for query in ("?posts=1&per_bucket=100", "?posts=1"):
+            self.assertEqual(len(self.get(query)["buckets"][0]["posts"]), 2)
+        self.assertEqual(len(self.get("?posts=1&per_bucket=0")["buckets"][0]["posts"]), 1)
+
+    def test_category_and_tag_filters(self):
+        data = self.get(f"?category={self.other.pk}")
+        self.assertEqual([(b["month"], b["count"]) for b in data["buckets"]], [(1, 1)])
+        # "Writing": two March posts (the first was re-tagged) and the January one
+        data = self.get(f"?tags={self.tags[0].pk}")
+        self.assertEqual([(b["month"], b["count"]) for b in data["buckets"]], [(3, 2), (1, 1)])
+        self.assertEqual(self.client.get("/api/archive/?category=x").status_code, 400)
+
+
+class SitemapTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        # No frontend tree or manifest: "/" is the only static route
+        patcher = override_settings(
+            MEDIA_ROOT=str(root / "media"), STATIC_ROOT=str(root / "static"), SITE_URL="https://zuuu.uz",
+            ROUTE_MANIFEST_PATH=root / "routes.json", FRONTEND_APP_DIR=root / "app",
+        )
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        self.media = root / "media"
+
+    def test_splits_at_max_urls_and_removes_stale_shards(self):
+        posts = [self.make_post(f"Post {n}") for n in range(3)]
+        with override_settings(SITEMAP_MAX_URLS=2):
+            generate_sitemap(domain="https://zuuu.uz")
+        names = sorted(path.name for path in self.media.iterdir())
+        self.assertEqual(names, [
+            "sitemap-1.xml", "sitemap-1.xml.gz", "sitemap-2.xml", "sitemap-2.xml.gz",
+            "sitemap.xml", "sitemap.xml.gz", "sitemap_index.xml", "sitemap_index.xml.gz",
+        ])
+        self.assertIn("<sitemapindex", (self.media / "sitemap.xml").read_text())
+        self.assertEqual((self.media / "sitemap-2.xml").read_text().count("<url>"), 2)
+
+        Post.objects.filter(pk__in=[post.pk for post in posts[1:]]).delete()
+        with override_settings(SITEMAP_MAX_URLS=2):
+            generate_sitemap(domain="https://zuuu.uz")
+        self.assertEqual(sorted(path.name for path in self.media.iterdir()), ["sitemap.xml", "sitemap.xml.gz"])
+        self.assertIn("<urlset", (self.media / "sitemap.xml").read_text())
+
+    def test_one_task_is_queued_per_burst(self):
+        for _ in range(3):
+            tasks.schedule_sitemap_refresh()
+        tasks.regenerate_sitemap.apply_async.assert_called_once()
+
+    def test_contended_lock_requeues_instead_of_rebuilding(self):
+        cache.add(tasks.SITEMAP_LOCK_KEY, "another-worker")
+        with mock.patch("blog.tasks.generate_sitemap") as generate:
+            tasks.regenerate_sitemap()
+        generate.assert_not_called()
+        tasks.regenerate_sitemap.apply_async.assert_called_once()
+        self.assertEqual(cache.get(tasks.SITEMAP_LOCK_KEY), "another-worker")
+
+    def test_gzip_twin_is_served_only_when_accepted(self):
+        self.make_post()
+        xml = self.client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="identity")
+        plain = b"".join(xml.streaming_content)
+        self.assertFalse(xml.has_header("Content-Encoding"))
+
+        response = self.client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="br, gzip;q=0.8")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), plain)
+
+        for refused in ("gzip;q=0", "*;q=0", "gzip;q=0, *"):
+            response = self.client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING=refused)
+            self.assertFalse(response.has_header("Content-Encoding"), refused)
+
+    def test_matching_if_none_match_is_not_modified(self):
+        response = self.client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="gzip")
+        repeat = self.client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat["ETag"], response["ETag"])
+
+
+class ContentArtifactTests(TestCase):
+    def test_anchors_land_in_heading_tags_whatever_the_line_breaks(self):
+        for separator in ("\r\n", "\r", "\x0c", "\u2028", "\u2029", "\x85"):
+            with self.subTest(separator=repr(separator)):
+                # getpos() lines are "\n"-separated; the other breaks must not shift offsets
+                html = f"<p>Copied{separator}line</p>\n<h2>Task 2</h2>{separator}\n<h3 class='x'>Tips</h3>"
+                artifacts = analyze_html(html)
+                self.assertIn('<h2 id="task-2">Task 2</h2>', artifacts.html)
+                self.assertIn('<h3 id="tips" class=\'x\'>Tips</h3>', artifacts.html)
+                self.assertTrue(only_anchors_added(html, artifacts.html))
+                # Re-analysing keeps the stored ids: saving again changes nothing
+                self.assertEqual(analyze_html(artifacts.html).html, artifacts.html)
+
+    def test_only_anchors_added_rejects_other_edits(self):
+        html = "<h2>Title</h2><p>Copied\u2028line</p>"
+        self.assertFalse(only_anchors_added(html, '<h2 id="title">Title</h2><p>Copied\u2028lin id="task-2"e</p>'))
+        self.assertTrue(only_anchors_added(html, '<h2 id="title">Title</h2><p>Copied\u2028line</p>'))
+
+
+class OutboxDrainTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        OutboxEvent.objects.all().delete()
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failing_kind_is_retried_then_dropped(self):
+        search, cache_handler = mock.Mock(side_effect=RuntimeError("boom")), mock.Mock()
+        outbox.emit(OutboxEvent.SEARCH, [1, 2])
+        outbox.emit(OutboxEvent.CACHE, ["posts"])
+        with mock.patch.dict(outbox.HANDLERS, {OutboxEvent.SEARCH: search, OutboxEvent.CACHE: cache_handler}), \
+                self.assertLogs("blog.outbox", "ERROR") as logs:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(outbox.drain(), (1, 2))
+            # The other kind in the batch was still applied and removed
+            cache_handler.assert_called_once_with({"posts"})
+            self.assertEqual(
+                sorted(OutboxEvent.objects.values_list("kind", "attempts")),
+                [(OutboxEvent.SEARCH, 1), (OutboxEvent.SEARCH, 1)],
+            )
+            self.assertEqual(outbox.drain(), (0, 2))
+        self.assertFalse(OutboxEvent.objects.exists())
+        search.assert_called_with({"1", "2"})
+        self.assertIn("Dropped 2 outbox event(s) after 2 attempts", logs.output[-1])
+
+    def test_after_commit_kinds_run_after_the_drain_commits(self):
+        cache_handler, search = mock.Mock(), mock.Mock()
+        outbox.emit(OutboxEvent.CACHE, ["posts", "tags"])
+        outbox.emit(OutboxEvent.SEARCH, [1])
+        with mock.patch.dict(outbox.HANDLERS, {OutboxEvent.SEARCH: search, OutboxEvent.CACHE: cache_handler}):
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.assertEqual(outbox.drain(), (3, 0))
+                search.assert_called_once_with({"1"})
+                cache_handler.assert_not_called()
+            for callback in callbacks:
+                callback()
+        cache_handler.assert_called_once_with({"posts", "tags"})
+
+
+class SharedCacheCheckTests(TestCase):
+    LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    REDIS = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://localhost"}}
+
+    def test_process_local_cache_with_celery_workers_warns(self):
+        with override_settings(CACHES=self.LOCMEM, CELERY_TASK_ALWAYS_EAGER=False):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ["blog.W001"])
+
+    def test_default_settings_pass_check(self):
+        # The repo defaults (no REDIS_CACHE_URL, tasks not eager) must not stop migrate/runserver/test
+        with override_settings(CACHES=self.LOCMEM, CELERY_TASK_ALWAYS_EAGER=False):
+            call_command("check", stdout=StringIO(), stderr=StringIO())
+            ids = [message.id for message in run_checks(include_deployment_checks=True)]
+        self.assertIn("blog.W001", ids)
+
+    def test_shared_cache_or_eager_tasks_pass(self):
+        with override_settings(CACHES=self.REDIS, CELERY_TASK_ALWAYS_EAGER=False):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES=self.LOCMEM, CELERY_TASK_ALWAYS_EAGER=True):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class AIGenerationInFlightTests(BlogTestCase):
+    PARAMS = {"topic": "IELTS Writing Task 2", "keywords": "essay, band 7", "tone": "expert"}
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        patcher = mock.patch("blog.ai_services._generate_uncached")
+        self.generate = patcher.start()
+        self.addCleanup(patcher.stop)
+        # Another request is generating the same post right now
+        key = generation_key(**self.PARAMS)
+        cache.add(f"aigen:lock:{key}", "other", timeout=60)
+        cache.set(GENERATION_TASK_KEY.format(key), "task-123", timeout=60)
+
+    def test_sync_admin_request_returns_409_with_the_running_task(self):
+        url = reverse("admin:blog_post_ai_generate")
+        started = time.monotonic()
+        response = self.client.post(url, {**self.PARAMS, "sync": True}, format="json")
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["task_id"], "task-123")
+        self.generate.assert_not_called()
+
+    def test_no_wait_raises_instead_of_polling(self):
+        with self.assertRaises(AIGenerationInProgress):
+            generate_post_with_ai(**self.PARAMS, wait=False)
+        self.generate.assert_not_called()
+
+
+class DraftTests(BlogTestCase):
+    def post_count(self):
+        self.category.refresh_from_db()
+        return self.category.post_count
+
+    def test_post_count_follows_publication(self):
+        post = self.make_post("Draft", is_draft=True)
+        self.assertEqual(self.post_count(), 0)
+        post = Post.objects.get(pk=post.pk)
+        post.is_draft = False
+        post.save()
+        self.assertEqual(self.post_count(), 1)
+        post.is_draft = True
+        post.save()
+        self.assertEqual(self.post_count(), 0)
+        post.delete()
+        self.assertEqual(self.post_count(), 0)
+
+    def test_ingested_drafts_are_not_counted(self):
+        item = {"content": "<p>Text.</p>", "category": self.category.pk, "tags": [], "tag_names": ["Writing"]}
+        ingest_posts([{**item, "title": "Draft", "is_draft": True}, {**item, "title": "Live"}], author=self.user)
+        self.assertEqual(self.post_count(), 1)
+        Category.objects.update(post_count=5)
+        rebuild_counters()
+        self.assertEqual(self.post_count(), 1)
+
+    def test_drafts_are_not_related_candidates_until_published(self):
+        post = self.make_post("Published")
+        draft = self.make_post("Draft", is_draft=True)
+        self.drain()
+        self.assertFalse(RelatedPost.objects.filter(post=post).exists())
+        self.assertEqual(list(RelatedPost.objects.filter(post=draft).values_list("related_id", flat=True)), [post.pk])
+        draft = Post.objects.get(pk=draft.pk)
+        draft.is_draft = False
+        draft.save()
+        self.drain()
+        self.assertEqual(list(RelatedPost.objects.filter(post=post).values_list("related_id", flat=True)), [draft.pk])
+
+
+    def test_draft_comments_are_hidden_from_non_staff(self):
+        draft = self.make_post("Draft", is_draft=True)
+        comment = Comment.objects.create(post=draft, author=self.user, text="Early")
+        visible = Comment.objects.create(post=self.make_post("Live"), author=self.user, text="Hi")
+        self.assertEqual([row["id"] for row in self.client.get("/api/comments/").json()["results"]], [visible.pk])
+        self.assertEqual(self.client.get(f"/api/comments/{comment.pk}/").status_code, 404)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.post("/api/comments/", {"post": draft.pk, "text": "Hi"}).status_code, 400)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(f"/api/comments/{comment.pk}/").status_code, 200)
+
+
+@override_settings(OPENAI_API_KEY="sk-test", OPENAI_GENERATION_MAX_ATTEMPTS=2, AI_BATCH_RATE_PER_MINUTE=0)
+class AIBatchRateLimitTests(BlogTestCase):
+    def openai_client(self):
+        # Every completion is too short, so each attempt also makes an expansion call
+        payload = {
+            "title": "T", "content": "<h2>A</h2><h3>B</h3><p>Conclusion.</p>", "seo_title": "T",
+            "seo_description": "D", "seo_keywords": "k", "tags": ["a", "b", "c"],
+        }
+        reply = mock.Mock()
+        reply.choices = [mock.Mock(message=mock.Mock(content=json.dumps(payload)))]
+        client = mock.patch("blog.ai_services.OpenAI").start()
+        self.addCleanup(mock.patch.stopall)
+        client.return_value.chat.completions.create.return_value = reply
+        return client.return_value.chat.completions.create
+
+    def test_limiter_waits_before_every_openai_request(self):
+        create = self.openai_client()
+        cached = generation_key("Cached topic")
+        cache.set(f"aigen:result:{cached}", {
+            "title": "Cached", "content": "<p>Cached.</p>", "seo_title": "", "seo_description": "",
+            "seo_keywords": "", "tags": ["Writing"],
+        })
+        with mock.patch.object(RateLimiter, "wait") as wait, self.assertLogs("blog.ai_services", "WARNING"):
+            items = generate_drafts(["Cached topic", "Fresh topic"], author=self.user)
+        self.assertEqual([item["status"] for item in items], ["saved", "failed"])
+        self.assertEqual(create.call_count, 4)  # 2 attempts + 2 expansions, none for the cached topic
+        self.assertEqual(wait.call_count, create.call_count)
@@ -0,0 +1,117 @@
+"""
+Frontend route manifest for sitemap URL discovery.
+
+`manage.py build_route_manifest` walks blog-frontend/app once and writes
+the static page routes to ROUTE_MANIFEST_PATH (JSON), together with the
+tree's newest directory mtime. Adding or removing a page changes its
+directory's mtime, so the command skips the walk while that key matches.
+
+Sitemap generation only reads the manifest (one stat + a cached JSON
+load), so it works on API hosts that don't ship the frontend at all.
+"""
+from pathlib import Path
+import json
+import os
+
+from django.conf import settings
+
+PAGE_SUFFIXES = (".tsx", ".ts", ".jsx", ".js")
+
+_cache = {}
+
+
+def frontend_app_dir():
+    return Path(getattr(settings, "FRONTEND_APP_DIR", Path(settings.BASE_DIR) / "blog-frontend" / "app"))
+
+
+def manifest_path():
+    return Path(getattr(settings, "ROUTE_MANIFEST_PATH", Path(settings.BASE_DIR) / "route_manifest.json"))
+
+
+def _route_parts(rel):
+    """URL segments of an app/ subdirectory, or None for non-static routes."""
+    parts = []
+    for part in rel.parts:
+        if not part or part.startswith("."):
+            continue
+        if "[" in part or "]" in part or part.startswith(("_", "@")):
+            # Dynamic segments, private folders and parallel-route slots
+            return None
+        if part.startswith("(") and part.endswith(")"):
+            # Route groups don't appear in the URL
+            continue
+        parts.append(part)
+    return parts
+
+
+def scan_routes(app_dir):
+    """(routes, newest directory mtime) from one walk of the Next.js app/ tree."""
+    routes = {"/"}
+    newest = 0
+    for root, dirs, files in os.walk(app_dir):
+        dirs[:] = [name for name in dirs if name != "node_modules"]
+        newest = max(newest, os.stat(root).st_mtime_ns)
+        if not any(name.startswith("page.") and name.endswith(PAGE_SUFFIXES) for name in files):
+            continue
+        parts = _route_parts(Path(root).relative_to(app_dir))
+        if parts is not None:
+            routes.add("/" + "/".join(parts))
+    return sorted(routes), newest
+
+
+def source_mtime(app_dir):
+    """Newest directory mtime under app_dir (dirs only: no file stats)."""
+    newest = 0
+    for root, dirs, files in os.walk(app_dir):
+        dirs[:] = [name for name in dirs if name != "node_modules"]
+        newest = max(newest, os.stat(root).st_mtime_ns)
+    return newest
+
+
+def _write_manifest(path, manifest):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.tmp")
+    temp.write_text(json.dumps(manifest, indent=2) + "\n")
+    os.replace(temp, path)
+
+
+def build_manifest(force=False):
+    """
+    Rewrite the manifest if the frontend tree changed since it was built
+    (or `force`). Returns (manifest dict, rebuilt?); None when there is
+    neither a frontend tree nor a manifest.
+    """
+    app_dir, path = frontend_app_dir(), manifest_path()
+    current = _read(path)
+    if not app_dir.is_dir():
+        return current, False
+    if not force and current and current.get("source_mtime") == source_mtime(app_dir):
+        return current, False
+
+    routes, newest = scan_routes(app_dir)
+    manifest = {"source": str(app_dir), "source_mtime": newest, "routes": routes}
+    _write_manifest(path, manifest)
+    return manifest, True
+
+
+def _read(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if _cache.get("key") != key:
+        _cache["manifest"] = json.loads(path.read_text())
+        _cache["key"] = key
+    return _cache["manifest"]
+
+
+def static_routes(refresh=False):
+    """
+    Static frontend routes for the sitemap, from the manifest. It is built
+    on first use when missing; `refresh` re-checks the frontend tree.
+    """
+    manifest = _read(manifest_path())
+    if refresh or manifest is None:
+        manifest, _ = build_manifest()
+    return manifest["routes"] if manifest else ["/"]
@@ -1,12 +1,12 @@
 import requests
 import json
-import time
 
 # ==========================================
 # ⚙️ CONFIGURATION
 # ==========================================
 BASE_URL = "https://api.zuuu.uz"
 API_POSTS_URL = f"{BASE_URL}/api/posts/"
+API_BULK_URL = f"{API_POSTS_URL}bulk/"
 API_TOKEN_URL = f"{BASE_URL}/api/token/" 
 
 # 🔒 CREDENTIALS
@@ -32,13 +32,15 @@ def get_token():
         print(f"❌ Connection Error: {e}")
         return None
 
-def create_post(data, token):
+def create_posts(data, token):
+    # Bitta so'rovda hammasi: /api/posts/bulk/ (slug, tag, sitemap bir marta)
     headers = {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
-    response = requests.post(API_POSTS_URL, headers=headers, json=data)
+    response = requests.post(API_BULK_URL, headers=headers, json={"posts": data})
     if response.status_code == 201:
-        print(f"✅ Success: {data['title']}")
+        for post in response.json()["posts"]:
+            print(f"✅ Success: {post['title']} -> /posts/{post['slug']}")
     else:
-        print(f"❌ Failed: {data['title']} | Response: {response.text}")
+        print(f"❌ Failed: {len(data)} posts | Response: {response.text}")
 
 # ---------------------------------------------------------
 # 📝 1200+ CHARACTER POSTS
@@ -105,9 +107,7 @@ def run():
     token = get_token()
     if not token: return
     print("-------------------------------------------------")
-    for post in posts:
-        create_post(post, token)
-        time.sleep(0.5)
+    create_posts(posts, token)
     print("-------------------------------------------------")
     print("✨ Seeding Complete!")
 
@@ -1,83 +1,250 @@
+"""
+Streaming sitemap writer.
+
+URLs are written to disk as they are produced: frontend static routes
+first (from the route manifest, see blog/utils/routes.py), then indexable published posts from one chunked (slug, updated_at) query, so
+memory stays flat whatever the post count. A file is closed once it
+reaches SITEMAP_MAX_URLS entries or SITEMAP_MAX_BYTES (the protocol's
+50,000 URLs / 50 MB), and the next URL opens a new one.
+
+One file  -> <output> (sitemap.xml) is a plain <urlset>.
+N files   -> <stem>-1.xml ... <stem>-N.xml plus <stem>_index.xml; <output>
+             gets the same <sitemapindex>, so /sitemap.xml stays a valid
+             entry point for crawlers.
+
+Every file is written under a temporary name and renamed into place, so
+readers never see a half-written sitemap. Each one also gets a gzip
+twin (<name>.gz) that the sitemap views serve to gzip-capable clients. Regeneration after writes is
+debounced by blog.tasks.schedule_sitemap_refresh.
+"""
 from pathlib import Path
+import gzip
 import os
-import xml.etree.ElementTree as ET
+import logging
+import shutil
+import tempfile
+from xml.sax.saxutils import escape
+
 from django.conf import settings
 
+from .routes import static_routes
+
 try:
     from blog.models import Post
 except Exception:
     Post = None
 
+logger = logging.getLogger(__name__)
 
-def _collect_urls():
-    urls = {"/"}
-    frontend_app = Path(settings.BASE_DIR) / "blog-frontend" / "app"
-
-    if frontend_app.exists():
-        for root, dirs, files in os.walk(frontend_app):
-            for fname in files:
-                if fname.startswith("page.") and fname.endswith((".tsx", ".ts", ".jsx", ".js")):
-                    p = Path(root)
-                    try:
-                        rel = p.relative_to(frontend_app)
-                    except Exception:
-                        rel = Path(".")
-
-                    if str(rel) in {".", ""}:
-                        urls.add("/")
-                        continue
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = f'{XML_DECLARATION}<urlset xmlns="{SITEMAP_NS}">\n'.encode()
+URLSET_CLOSE = b"</urlset>\n"
+POST_CHUNK_SIZE = 2000
+GZIP_LEVEL = 6
 
-                    parts = [part for part in rel.parts if part and not part.startswith(".")]
-                    if any("[" in part or "]" in part for part in parts):
-                        continue
-
-                    urls.add("/" + "/".join(parts))
-
-    if Post is not None:
-        for post in Post.objects.filter(is_indexable=True).only("slug"):
-            if post.slug:
-                urls.add(f"/posts/{post.slug}")
 
-    return sorted(urls)
+def max_urls():
+    return getattr(settings, "SITEMAP_MAX_URLS", 50_000)
 
 
-def build_sitemap_xml(domain="https://zuuu.uz"):
-    domain = domain.rstrip('/')
-    urlset = ET.Element("urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
+def max_bytes():
+    return getattr(settings, "SITEMAP_MAX_BYTES", 50 * 1024 * 1024)
 
-    for u in _collect_urls():
-        url_el = ET.SubElement(urlset, "url")
-        loc = ET.SubElement(url_el, "loc")
-        loc.text = f"{domain}{u}"
-        if u.startswith("/posts/") and Post is not None:
-            slug = u.split("/posts/")[-1]
-            try:
-                p = Post.objects.get(slug=slug)
-                lastmod = ET.SubElement(url_el, "lastmod")
-                lastmod.text = p.updated_at.date().isoformat()
-            except Exception:
-                pass
 
-    return ET.tostring(urlset, encoding="utf-8", xml_declaration=True)
+def iter_entries(refresh_routes=False):
+    """(path, lastmod date or None) for every sitemap URL, posts streamed from the database."""
+    for path in static_routes(refresh=refresh_routes):
+        yield path, None
 
-
-def generate_sitemap(domain='https://zuuu.uz', output=None):
+    if Post is not None:
+        rows = (
+            Post.objects.published()
+            .filter(is_indexable=True)
+            .exclude(slug="")
+            .order_by("-created_at", "-id")
+            .values_list("slug", "updated_at")
+            .iterator(chunk_size=POST_CHUNK_SIZE)
+        )
+        for slug, updated_at in rows:
+            yield f"/posts/{slug}", updated_at.date() if updated_at else None
+
+
+def _url_element(loc, lastmod):
+    parts = ["<url><loc>", escape(loc), "</loc>"]
+    if lastmod is not None:
+        parts += ["<lastmod>", lastmod.isoformat(), "</lastmod>"]
+    parts.append("</url>\n")
+    return "".join(parts).encode()
+
+
+def _temp_file(path):
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    return os.fdopen(fd, "wb"), Path(name)
+
+
+def _write_atomic(path, data=None, source=None):
+    """Write `data` (or copy the file `source`) to `path` via temp file + rename."""
+    handle, temp = _temp_file(path)
+    try:
+        with handle:
+            if source is None:
+                handle.write(data)
+            else:
+                with open(source, "rb") as src:
+                    shutil.copyfileobj(src, handle)
+        os.chmod(temp, 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+def gzip_path(path):
+    return path.with_name(f"{path.name}.gz")
+
+
+def _write_gzip(path):
+    """<path>.gz next to `path`, streamed and renamed into place like the XML itself."""
+    target = gzip_path(path)
+    handle, temp = _temp_file(target)
+    try:
+        with handle, open(path, "rb") as src:
+            # mtime=0: identical XML gives byte-identical gzip
+            with gzip.GzipFile(fileobj=handle, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as gz:
+                shutil.copyfileobj(src, gz)
+        os.chmod(temp, 0o644)
+        os.replace(temp, target)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+def _publish(temp, path):
+    os.replace(temp, path)
+    _write_gzip(path)
+
+
+class _Shard:
+    def __init__(self, path):
+        self.path = path
+        self.handle, self.temp = _temp_file(path)
+        self.handle.write(URLSET_OPEN)
+        self.size = len(URLSET_OPEN) + len(URLSET_CLOSE)
+        self.count = 0
+        self.lastmod = None
+
+    def fits(self, element):
+        return self.count < max_urls() and self.size + len(element) <= max_bytes()
+
+    def add(self, element, lastmod):
+        self.handle.write(element)
+        self.size += len(element)
+        self.count += 1
+        if lastmod is not None and (self.lastmod is None or lastmod > self.lastmod):
+            self.lastmod = lastmod
+
+    def close(self):
+        self.handle.write(URLSET_CLOSE)
+        self.handle.close()
+        os.chmod(self.temp, 0o644)
+
+    def discard(self):
+        self.handle.close()
+        self.temp.unlink(missing_ok=True)
+
+
+def _index_xml(domain, shards):
+    lines = [XML_DECLARATION, f'<sitemapindex xmlns="{SITEMAP_NS}">\n']
+    for shard in shards:
+        lines.append(f"<sitemap><loc>{escape(domain)}/{escape(shard.path.name)}</loc>")
+        if shard.lastmod is not None:
+            lines.append(f"<lastmod>{shard.lastmod.isoformat()}</lastmod>")
+        lines.append("</sitemap>\n")
+    lines.append("</sitemapindex>\n")
+    return "".join(lines).encode()
+
+
+def shard_path(output, number):
+    return output.with_name(f"{output.stem}-{number}{output.suffix}")
+
+
+def index_path(output):
+    return output.with_name(f"{output.stem}_index{output.suffix}")
+
+
+def _remove_stale(output, keep):
+    """Drop shards (and the index) left over from a previous, larger run."""
+    names = {path.name for path in keep}
+    stale = [
+        path for path in output.parent.glob(f"{output.stem}-*{output.suffix}")
+        if path.name not in names and path.stem[len(output.stem) + 1:].isdigit()
+    ]
+    if index_path(output).name not in names:
+        stale.append(index_path(output))
+    for path in stale:
+        path.unlink(missing_ok=True)
+        gzip_path(path).unlink(missing_ok=True)
+
+
+def write_sitemaps(domain, output, refresh_routes=False):
+    """Stream every URL into `output` (sharded when over the limits). Returns the written paths."""
     domain = domain.rstrip("/")
+    shards = []
+    try:
+        for path, lastmod in iter_entries(refresh_routes):
+            element = _url_element(f"{domain}{path}", lastmod)
+            if not shards or not shards[-1].fits(element):
+                if shards:
+                    shards[-1].close()
+                shards.append(_Shard(shard_path(output, len(shards) + 1)))
+            shards[-1].add(element, lastmod)
+        if shards:
+            shards[-1].close()
+    except BaseException:
+        for shard in shards:
+            shard.discard()
+        raise
+
+    if len(shards) <= 1:
+        if shards:
+            _publish(shards[0].temp, output)
+        else:
+            _write_atomic(output, URLSET_OPEN + URLSET_CLOSE)
+            _write_gzip(output)
+        written = [output]
+    else:
+        # Shards first, the index files that point at them last.
+        for shard in shards:
+            _publish(shard.temp, shard.path)
+        index = _index_xml(domain, shards)
+        for path in (index_path(output), output):
+            _write_atomic(path, index)
+            _write_gzip(path)
+        written = [output, index_path(output), *(shard.path for shard in shards)]
+
+    _remove_stale(output, written)
+    return written
+
+
+def generate_sitemap(domain='https://zuuu.uz', output=None, refresh_routes=False):
     if output is None:
         output = str(Path(settings.MEDIA_ROOT) / "sitemap.xml")
 
     output = Path(output)
     output.parent.mkdir(parents=True, exist_ok=True)
-
-    xml_bytes = build_sitemap_xml(domain=domain)
-    output.write_bytes(xml_bytes)
+    written = write_sitemaps(domain, output, refresh_routes=refresh_routes)
 
     # Also try to write to STATIC_ROOT if configured
     try:
         static_root = Path(settings.STATIC_ROOT)
-        if static_root.exists():
-            (static_root / "sitemap.xml").write_bytes(xml_bytes)
-    except Exception:
-        pass
+        if static_root.exists() and static_root != output.parent:
+            # Same order as above: the entry point is replaced after its shards.
+            for path in reversed(written):
+                _write_atomic(static_root / gzip_path(path).name, source=gzip_path(path))
+                _write_atomic(static_root / path.name, source=path)
+            _remove_stale(static_root / output.name, written)
+    except OSError:
+        logger.exception("Could not copy sitemap to STATIC_ROOT")
 
     return str(output)
@@ -0,0 +1,129 @@
+"""
+Shared slug allocator for Post and Tag (and bulk imports).
+
+Instead of probing `slug`, `slug-1`, `slug-2`, ... with one exists()
+query each, every existing slug that could collide with the base is
+fetched in a single query and the first free suffix is picked in memory.
+The query is a plain prefix match (LIKE 'base%'), served by the
+varchar_pattern_ops "_like" index Django creates next to a unique
+SlugField on PostgreSQL; the suffix pattern is checked in Python. Slugs
+are truncated to the field's max_length (suffix included).
+
+Allocation alone can't stop two concurrent writers from choosing the
+same free slug, so the save helpers run the INSERT in a savepoint and
+re-allocate when the unique slug constraint fires.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Room kept for "-<n>" when a long base has to be truncated
+SUFFIX_ROOM = 6
+SAVE_ATTEMPTS = 5
+
+
+def slug_base(value, max_length, fallback):
+    base = slugify(value or "")[:max_length].strip("-")
+    return base or fallback
+
+
+def _with_suffix(base, counter, max_length):
+    suffix = f"-{counter}"
+    return f"{base[:max_length - len(suffix)].rstrip('-')}{suffix}"
+
+
+def _candidates(base, max_length):
+    """(prefix, pattern): slugs _with_suffix(base, n) could collide with start with prefix and match pattern."""
+    if len(base) <= max_length - SUFFIX_ROOM:
+        return base, rf"{re.escape(base)}(?:-[0-9]+)?"
+    prefix = base[:max_length - SUFFIX_ROOM]
+    return prefix, rf"{re.escape(base)}|{re.escape(prefix)}[-a-z0-9_]*-[0-9]+"
+
+
+def allocate_slugs(model, values, field="slug", exclude_pk=None):
+    """Unique slugs for `values` (in order), with one query for the whole batch."""
+    max_length = model._meta.get_field(field).max_length
+    bases = [slug_base(value, max_length, model._meta.model_name) for value in values]
+    if not bases:
+        return []
+
+    candidates = [_candidates(base, max_length) for base in set(bases)]
+    clash = re.compile("|".join(f"(?:{pattern})" for _, pattern in candidates))
+    queryset = model._default_manager.filter(
+        reduce(or_, (Q(**{f"{field}__startswith": prefix}) for prefix in {prefix for prefix, _ in candidates}))
+    )
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    # The prefix also matches unrelated slugs ("base-other-words"); keep only possible clashes
+    taken = {
+        slug for slug in queryset.values_list(field, flat=True).iterator()
+        if clash.fullmatch(slug)
+    }
+
+    slugs = []
+    for base in bases:
+        slug, counter = base, 1
+        while slug in taken:
+            slug = _with_suffix(base, counter, max_length)
+            counter += 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slug(model, value, field="slug", exclude_pk=None):
+    return allocate_slugs(model, [value], field=field, exclude_pk=exclude_pk)[0]
+
+
+def _slug_clash(model, field, slugs, exclude_pk=None):
+    queryset = model._default_manager.filter(**{f"{field}__in": slugs})
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset.exists()
+
+
+def save_with_unique_slug(instance, value, save, field="slug", attempts=SAVE_ATTEMPTS):
+    """
+    Call save() with instance.<field> filled from `value` when empty.
+    A unique violation on a slug we allocated is retried with a fresh
+    slug; anything else is re-raised.
+    """
+    if getattr(instance, field):
+        return save()
+
+    model = type(instance)
+    for attempt in range(attempts):
+        setattr(instance, field, allocate_slug(model, value, field=field, exclude_pk=instance.pk))
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            slug = getattr(instance, field)
+            if attempt + 1 == attempts or not _slug_clash(model, field, [slug], instance.pk):
+                raise
+            setattr(instance, field, "")
+
+
+def bulk_create_with_unique_slugs(model, objs, values, field="slug", prepare=None,
+                                  attempts=SAVE_ATTEMPTS, **bulk_kwargs):
+    """
+    bulk_create() after allocating a slug per object from `values`.
+    `prepare(obj)` runs after each allocation (e.g. to derive URLs from
+    the slug). The whole batch is re-allocated on a slug clash.
+    """
+    for attempt in range(attempts):
+        for obj, slug in zip(objs, allocate_slugs(model, values, field=field)):
+            setattr(obj, field, slug)
+            if prepare is not None:
+                prepare(obj)
+        try:
+            with transaction.atomic():
+                return model._default_manager.bulk_create(objs, **bulk_kwargs)
+        except IntegrityError:
+            slugs = [getattr(obj, field) for obj in objs]
+            if attempt + 1 == attempts or not _slug_clash(model, field, slugs):
+                raise
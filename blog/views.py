@@ -1,21 +1,40 @@
-from rest_framework import viewsets, filters, permissions, generics
+from rest_framework import viewsets, filters, permissions, generics, serializers, status
+from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 from django.conf import settings
-from django.http import HttpResponse
+from django.db.models import Prefetch
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from celery.result import AsyncResult
 from .models import Category, Post, Comment, AdSenseSettings, Tag
+from .archive import archive_buckets
+from .cache import AnonymousResponseCacheMixin
+from .conditional import ConditionalGetMixin, make_etag, post_detail_validators, post_list_validators
+from .fieldsets import SparseFieldsetMixin
+from .ingest import BulkPostSerializer, ingest_posts
+from .pagination import CreatedAtCursorPagination, PageOrCursorPagination
+from .search import PostFullTextSearchFilter, suggest
+from .snapshots import SnapshotRetrieveMixin
 from .serializers import (
     CategorySerializer,
     PostSerializer,
+    PostListSerializer,
     CommentSerializer,
     UserSerializer,
     AdSenseSettingsSerializer,
     TagSerializer,
 )
 from django.contrib.auth.models import User
-from .utils.sitemap import build_sitemap_xml
+import os
+import time
+from pathlib import Path
+from .tasks import schedule_sitemap_refresh
+from .utils.sitemap import generate_sitemap, gzip_path, index_path, shard_path
 
 
 class IsAuthenticatedOrReadOnlyDeleteByVasliddin(permissions.IsAuthenticatedOrReadOnly):
@@ -29,22 +48,114 @@ class IsAuthenticatedOrReadOnlyDeleteByVasliddin(permissions.IsAuthenticatedOrRe
         return super().has_permission(request, view)
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    # Optimizatsiya: author va category-ni bitta so'rovda oladi, commentlarni keshlaydi
-    queryset = Post.objects.select_related('author', 'category').prefetch_related('comments__author', 'tags').all()
+class PostViewSet(
+    ConditionalGetMixin,
+    AnonymousResponseCacheMixin,
+    SnapshotRetrieveMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
+    # Optimizatsiya: author va category-ni bitta so'rovda oladi, taglarni keshlaydi
+    queryset = Post.objects.select_related('author', 'category').prefetch_related('tags').defer('search_vector', 'snapshot')
     serializer_class = PostSerializer
     lookup_field = 'slug'
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = PageOrCursorPagination
+    filter_backends = [DjangoFilterBackend, PostFullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'author', 'tags']
     search_fields = ['title', 'content']
     ordering_fields = ['created_at', 'title']
+    # Cursor pagination o'qiydi, ?fields= da bo'lmasa ham yuklanadi
+    fieldset_required = ('created_at',)
+
+    def visible_posts(self, queryset=None):
+        # Qoralamalar (is_draft) faqat staff uchun ko'rinadi
+        queryset = Post.objects.all() if queryset is None else queryset
+        return queryset if self.request.user.is_staff else queryset.published()
+
+    def get_snapshot_queryset(self):
+        return self.visible_posts()
+
+    def get_queryset(self):
+        queryset = self.visible_posts(super().get_queryset())
+        if self.action == 'list':
+            # Kartochkalar uchun: content va commentlar kerak emas
+            queryset = queryset.defer('content', 'toc').order_by('-created_at', '-id')
+        elif self.action == 'retrieve':
+            # Faqat oxirgi N ta izoh + umumiy soni
+            limit = getattr(settings, 'POST_DETAIL_COMMENT_LIMIT', 10)
+            recent = Comment.objects.select_related('author').order_by('-created_at', '-id')[:limit]
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=recent, to_attr='recent_comments')
+            )
+        elif self.action == 'related':
+            # Faqat mavjudligini tekshirish (404) uchun: id yetarli
+            return queryset.select_related(None).prefetch_related(None).only('id')
+        # ?fields= / ?omit= : faqat kerakli ustunlar, join va prefetchlar
+        return self.trim_queryset(queryset)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return PostListSerializer
+        return super().get_serializer_class()
+
+    def get_cache_namespaces(self):
+        if self.action == 'retrieve':
+            return (f"post:{self.kwargs[self.lookup_field]}", 'post-relations')
+        return ('posts',)
+
+    def get_list_validators(self, request):
+        return post_list_validators(request, self.filter_queryset(self.get_queryset()))
+
+    def get_detail_validators(self, request):
+        return post_detail_validators(request, self.visible_posts(), self.kwargs[self.lookup_field])
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
-class CategoryViewSet(viewsets.ModelViewSet):
-    queryset = Category.objects.all()
+    @action(detail=False, methods=['post'], url_path='bulk', permission_classes=[permissions.IsAuthenticated])
+    def bulk(self, request):
+        """Ko'p postni bitta so'rovda yaratish: /api/posts/bulk/ (blog/ingest.py)"""
+        data = {'posts': request.data} if isinstance(request.data, list) else request.data
+        serializer = BulkPostSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        posts = ingest_posts(serializer.validated_data['posts'], author=request.user)
+        return Response(
+            {
+                'created': len(posts),
+                'posts': [{'id': post.pk, 'slug': post.slug, 'title': post.title} for post in posts],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=['get'], url_path='comments')
+    def comments(self, request, slug=None):
+        """Cursor-paginated comments of one post: /api/posts/{slug}/comments/"""
+        post = get_object_or_404(self.visible_posts().only('id'), slug=slug)
+        queryset = Comment.objects.filter(post=post).select_related('author')
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = CommentSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='related')
+    def related(self, request, slug=None):
+        """Precomputed related posts (blog/related.py): /api/posts/{slug}/related/"""
+        post = self.get_object()
+        related = (
+            self.visible_posts()
+            .filter(related_from__post=post)
+            .select_related('author', 'category')
+            .prefetch_related('tags')
+            .defer('content', 'toc', 'search_vector', 'snapshot')
+            .order_by('related_from__rank')
+        )
+        serializer = PostListSerializer(related, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+class CategoryViewSet(AnonymousResponseCacheMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Category.objects.order_by('name')
+    cache_namespaces = ('categories',)
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -52,9 +163,13 @@ class CategoryViewSet(viewsets.ModelViewSet):
     search_fields = ["name", "slug"]
     ordering_fields = ["name", "id"]
 
+    def get_queryset(self):
+        return self.trim_queryset(super().get_queryset())
 
-class TagViewSet(viewsets.ModelViewSet):
+
+class TagViewSet(AnonymousResponseCacheMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.select_related("created_by").all()
+    cache_namespaces = ("tags",)
     serializer_class = TagSerializer
     permission_classes = [IsAuthenticatedOrReadOnlyDeleteByVasliddin]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -62,16 +177,30 @@ class TagViewSet(viewsets.ModelViewSet):
     search_fields = ["name", "slug"]
     ordering_fields = ["name", "created_at"]
 
+    def get_queryset(self):
+        return self.trim_queryset(super().get_queryset())
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.select_related('author').all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = PageOrCursorPagination
+    fieldset_required = ('created_at',)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            # Qoralama postlarning izohlari faqat staff uchun
+            queryset = queryset.filter(post__is_draft=False)
+        return self.trim_queryset(queryset)
 
     def perform_create(self, serializer):
+        if serializer.validated_data['post'].is_draft and not self.request.user.is_staff:
+            raise serializers.ValidationError({'post': ['Post not found.']})
         serializer.save(author=self.request.user)
 
 class RegisterView(generics.CreateAPIView):
@@ -92,10 +221,139 @@ class AdSenseSettingsView(generics.RetrieveAPIView):
         return AdSenseSettings.get_settings()
 
 
+class SuggestView(APIView):
+    """
+    Typeahead for the search box: /api/suggest/?q=ielts&limit=8
+    Returns a small ranked list of posts, tags and categories.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        max_limit = getattr(settings, "SUGGEST_MAX_LIMIT", 10)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 8)), 1), max_limit)
+        except ValueError:
+            limit = 8
+
+        results = suggest(query, limit=limit) if len(query) >= 2 else []
+        response = Response({"query": query, "results": results})
+        response["Cache-Control"] = "public, max-age=60"
+        return response
+
+
+class ArchiveView(AnonymousResponseCacheMixin, APIView):
+    """
+    Oylar bo'yicha arxiv: /api/archive/?category=1&tags=2&posts=1&per_bucket=5
+    Returns [{year, month, count}] newest first; `posts=1` adds post stubs per month.
+    """
+    permission_classes = [permissions.AllowAny]
+    cache_namespaces = ("archive",)
+
+    def get(self, request):
+        response = self._cached_response(self._build, request)
+        response["Cache-Control"] = "public, max-age=60"
+        return response
+
+    def _int_param(self, name, default=None):
+        value = self.request.query_params.get(name, "")
+        if value == "":
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise serializers.ValidationError({name: "A valid integer is required."})
+
+    def _build(self, request):
+        queryset = Post.objects.published()
+        category = self._int_param("category")
+        tag = self._int_param("tags")
+        if category is not None:
+            queryset = queryset.filter(category_id=category)
+        if tag is not None:
+            queryset = queryset.filter(tags__id=tag)
+
+        with_posts = request.query_params.get("posts", "").lower() in ("1", "true", "yes")
+        max_per_bucket = getattr(settings, "ARCHIVE_MAX_POSTS_PER_BUCKET", 50)
+        per_bucket = min(max(self._int_param("per_bucket", max_per_bucket), 1), max_per_bucket)
+
+        buckets = archive_buckets(queryset, with_posts=with_posts, per_bucket=per_bucket)
+        return Response({"count": sum(bucket["count"] for bucket in buckets), "buckets": buckets})
+
+
+def _sitemap_output():
+    return Path(settings.MEDIA_ROOT) / "sitemap.xml"
+
+
+def _accepts_gzip(request):
+    """Accept-Encoding lists gzip (or *, when gzip isn't named) with a non-zero q value."""
+    qualities = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, *params = [piece.strip() for piece in part.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _sitemap_file(request, path):
+    """
+    Serve a generated sitemap file (the .gz twin to gzip-capable clients)
+    with ETag / Last-Modified from its stat(); repeat fetches get a 304.
+    """
+    compressed = gzip_path(path)
+    use_gzip = _accepts_gzip(request) and compressed.exists()
+    served = compressed if use_gzip else path
+    try:
+        handle = open(served, "rb")
+    except FileNotFoundError:
+        raise Http404("No such sitemap")
+    stat = os.fstat(handle.fileno())
+    etag = make_etag(served.name, stat.st_mtime_ns, stat.st_size)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(handle, content_type="application/xml")
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+    else:
+        handle.close()
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_vary_headers(response, ("Accept-Encoding",))
+    response["Cache-Control"] = f"public, max-age={getattr(settings, 'SITEMAP_CACHE_SECONDS', 300)}"
+    return response
+
+
+@require_safe
 def sitemap_xml(request):
-    domain = getattr(settings, "SITE_URL", "https://zuuu.uz")
-    xml_content = build_sitemap_xml(domain=domain)
-    return HttpResponse(xml_content, content_type="application/xml")
+    # Writes keep the file fresh (blog.tasks); only a missing file is built in the request.
+    output = _sitemap_output()
+    if not output.exists():
+        generate_sitemap(domain=getattr(settings, "SITE_URL", "https://zuuu.uz"), output=output)
+    elif time.time() - output.stat().st_mtime > getattr(settings, "SITEMAP_MAX_AGE", 24 * 60 * 60):
+        # Safety net for missed refreshes; debounced, so concurrent crawlers queue one rebuild.
+        schedule_sitemap_refresh()
+    return _sitemap_file(request, output)
+
+
+@require_safe
+def sitemap_index_xml(request):
+    return _sitemap_file(request, index_path(_sitemap_output()))
+
+
+@require_safe
+def sitemap_shard_xml(request, number):
+    return _sitemap_file(request, shard_path(_sitemap_output(), number))
 
 
 class TaskStatusView(APIView):
@@ -115,6 +373,10 @@ class TaskStatusView(APIView):
 
         if status in ("PENDING", "RECEIVED"):
             response_data["message"] = "Task is pending and waiting for a worker."
+        elif status == "PROGRESS" and isinstance(task_result.info, dict):
+            # Batch generatsiya: har bir mavzu bo'yicha holat (blog/ai_batch.py)
+            response_data["progress"] = task_result.info
+            response_data["message"] = f"{task_result.info.get('done', 0)} of {task_result.info.get('total', 0)} done."
         elif status in ("STARTED", "PROGRESS", "RETRY"):
             response_data["message"] = str(task_result.info or "Task is running.")
         elif status == "SUCCESS":
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from datetime import timedelta
+from importlib.util import find_spec
 
 from dotenv import load_dotenv
 
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -77,8 +79,60 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # orjson (JSON) by default; MessagePack when the client sends Accept: application/msgpack
+    # (registered only when msgpack is installed, so such requests get a 406 otherwise)
+    'DEFAULT_RENDERER_CLASSES': [
+        'blog.renderers.ORJSONRenderer',
+        *(['blog.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'blog.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Max post stubs per month in /api/archive/?posts=1
+ARCHIVE_MAX_POSTS_PER_BUCKET = 50
+
+# Max posts per /api/posts/bulk/ request (blog/ingest.py)
+BULK_POST_MAX_BATCH = 500
+
+# Number of newest comments embedded in /api/posts/{slug}/ (the rest via /comments/)
+POST_DETAIL_COMMENT_LIMIT = 10
+
+# Post.word_count -> reading_minutes, and max Post.excerpt length (blog/content.py)
+READING_WORDS_PER_MINUTE = 200
+POST_EXCERPT_LENGTH = 200
+
+# Cache: Redis in production (REDIS_CACHE_URL), local memory otherwise (dev/tests).
+# Celery workers share locks and cache versions with the web process through it, so
+# local memory needs CELERY_TASK_ALWAYS_EAGER outside development (check --deploy: blog.W001).
+REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL", "").strip()
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'KEY_PREFIX': 'blog',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Anonymous GET cache for posts/categories/tags (blog/cache.py)
+API_CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "1") == "1"
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", "300"))
+
+# Fail list serialization that issues per-row queries (N+1). Dev only.
+SERIALIZER_QUERY_GUARD = DEBUG
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -114,9 +168,45 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
 OPENAI_TIMEOUT_SECONDS = int(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
 OPENAI_GENERATION_MAX_ATTEMPTS = int(os.getenv("OPENAI_GENERATION_MAX_ATTEMPTS", "3"))
+# Identical generation requests: cached result, one OpenAI call in flight, one shared task
+AI_GENERATION_CACHE_TTL = int(os.getenv("AI_GENERATION_CACHE_TTL", "86400"))
+AI_GENERATION_FAILURE_TTL = int(os.getenv("AI_GENERATION_FAILURE_TTL", "30"))
+AI_GENERATION_TASK_TTL = int(os.getenv("AI_GENERATION_TASK_TTL", "600"))
+# Batch generation (blog/ai_batch.py): topics per batch, parallel OpenAI calls, call starts per minute
+AI_BATCH_MAX_TOPICS = int(os.getenv("AI_BATCH_MAX_TOPICS", "50"))
+AI_BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", "4"))
+AI_BATCH_RATE_PER_MINUTE = int(os.getenv("AI_BATCH_RATE_PER_MINUTE", "20"))
+
+# Post full-text search (blog/search.py)
+POST_SEARCH_CONFIG = os.getenv("POST_SEARCH_CONFIG", "english")
+POST_SEARCH_BACKEND = os.getenv("POST_SEARCH_BACKEND", "fulltext")  # "legacy" = ILIKE SearchFilter
+
+SUGGEST_MAX_LIMIT = 10
+
+# Top-K stored per post in the related-posts index (blog/related.py)
+RELATED_POSTS_LIMIT = 6
 
 # Site URL used for canonical sitemap links
 SITE_URL = os.getenv("SITE_URL", "https://zuuu.uz")
+# Per-file sitemap limits (protocol: 50,000 URLs / 50 MB uncompressed); beyond them it is sharded
+SITEMAP_MAX_URLS = 50_000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+# Post writes only mark the sitemap dirty; one Celery rebuild runs this many seconds later
+SITEMAP_REFRESH_DELAY = 30
+SITEMAP_LOCK_TIMEOUT = 10 * 60
+# /sitemap.xml: browser/CDN max-age, and file age after which a request queues a rebuild
+SITEMAP_CACHE_SECONDS = 300
+SITEMAP_MAX_AGE = 24 * 60 * 60
+# Static frontend routes for the sitemap: `manage.py build_route_manifest` (blog/utils/routes.py)
+FRONTEND_APP_DIR = os.path.join(BASE_DIR, 'blog-frontend', 'app')
+ROUTE_MANIFEST_PATH = os.path.join(BASE_DIR, 'route_manifest.json')
+
+# Outbox for derived post data (blog/outbox.py): drained by the Celery task
+# blog.tasks.drain_outbox or `manage.py process_outbox --loop`
+OUTBOX_BATCH_SIZE = 1000
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_DRAIN_DELAY = 1  # seconds: coalesces a burst of commits into one drain
+OUTBOX_RETRY_DELAY = 60
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
@@ -126,4 +216,6 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes hard limit
-CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes soft limit (allows cleanup)
\ No newline at end of file
+CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes soft limit (allows cleanup)
+# Run tasks in-process (single-process development without Redis)
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "0") == "1"
\ No newline at end of file
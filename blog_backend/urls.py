@@ -3,7 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
-from blog.views import CategoryViewSet, PostViewSet, CommentViewSet, RegisterView, AdSenseSettingsView, TagViewSet, sitemap_xml, TaskStatusView
+from blog.views import CategoryViewSet, PostViewSet, CommentViewSet, RegisterView, AdSenseSettingsView, TagViewSet, sitemap_xml, sitemap_index_xml, sitemap_shard_xml, TaskStatusView, SuggestView, ArchiveView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -19,6 +19,9 @@ router.register(r'comments', CommentViewSet, basename='comment')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('sitemap.xml', sitemap_xml, name='sitemap_xml'),
+    # Only present once the sitemap outgrows one file (blog/utils/sitemap.py)
+    path('sitemap_index.xml', sitemap_index_xml, name='sitemap_index_xml'),
+    path('sitemap-<int:number>.xml', sitemap_shard_xml, name='sitemap_shard_xml'),
     
     # API endpoints
     path('api/', include(router.urls)),
@@ -28,6 +31,12 @@ urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
+    # Typeahead (posts, tags, categories)
+    path('api/suggest/', SuggestView.as_view(), name='suggest'),
+
+    # Year/month archive buckets (+ optional post stubs)
+    path('api/archive/', ArchiveView.as_view(), name='archive'),
+
     # AdSense Settings (read-only)
     path('api/adsense-settings/', AdSenseSettingsView.as_view(), name='adsense_settings'),
     